@@ -5,9 +5,24 @@ import timeit
 
 from uppaalpy.classes.class_tests.random_changers import random_scenario
 
-REPEAT = 5000
+from .common import patch_all
 
+REPEAT = 5000
 
+# Insert/remove/update counts for each random scenario.
+SCENARIOS = (
+    (1, 0, 0), (0, 1, 0), (0, 0, 1),
+    (1, 1, 0), (0, 2, 0), (2, 0, 0),
+    (2, 1, 0), (0, 2, 1), (2, 2, 0),
+    (0, 3, 1), (4, 0, 0), (2, 2, 1),
+    (1, 3, 1), (4, 1, 0), (2, 2, 2),
+    (1, 3, 2), (4, 1, 1), (5, 0, 0),
+    (1, 2, 2), (6, 0, 0), (1, 1, 4),
+    (2, 2, 3), (6, 0, 1), (1, 2, 4),
+    (3, 2, 3), (6, 1, 1), (2, 2, 4),
+    (3, 3, 3), (6, 2, 1), (2, 3, 4),
+    (4, 3, 3), (6, 2, 2), (2, 3, 5),
+)
 
 
 def random_scenario_without_specific_change_counts(nta_file, change_count):
@@ -31,137 +46,37 @@ def divide():
 
 
 def apply_random_scenario(nta_file, scenario, random_counts):
-    """Benchmark a random case."""
+    """Benchmark a random case.
+
+    Serialization is timed in memory. The output is written to /tmp/out.xml
+    once after each timed loop.
+    """
     divide()
     print(
         "Applying random scenario of {}i/{}r/{}u on {}".format(*random_counts, nta_file)
     )
     nta = scenario(nta_file, *random_counts)
 
-    acc_time = 0
     print("BENCHMARKING: nta.to_file (lxml): ", end="", flush=True)
-    for _ in range(REPEAT):
-        start = timeit.default_timer()
-        nta.to_file("/tmp/out.xml")
-        end = timeit.default_timer()
-        acc_time += end - start
-    print(acc_time)
-
-    acc_time = 0
-    print("BENCHMARKING: nta.flush_constraint_changes: ", end="", flush=True)
-    for _ in range(REPEAT):
-        start = timeit.default_timer()
-        nta.flush_constraint_changes("/tmp/out.xml")
-        end = timeit.default_timer()
-        acc_time += end - start
-    print(acc_time)
+    print(timeit.Timer(nta.to_bytes).timeit(number=REPEAT))
+    nta.to_file("/tmp/out.xml")
+
+    print("BENCHMARKING: nta.patch_cache.apply_patches: ", end="", flush=True)
+    print(timeit.Timer(patch_all(nta, nta_file)).timeit(number=REPEAT))
+    nta.flush_constraint_changes("/tmp/out.xml")
 
 
 if __name__ == "__main__":
-    small_nta = "benchmarks/ntas/small_nta.xml"
-    big_nta = "benchmarks/ntas/big_nta.xml"
+    ntas = (
+        ("SMALL NTA", "benchmarks/ntas/small_nta.xml"),
+        ("BIG NTA", "benchmarks/ntas/big_nta.xml"),
+    )
 
     divide()
     print("EXECUTING EACH SCENARIO %s TIMES." % (REPEAT))
-    divide()
-    print("SMALL NTA")
-
-    apply_random_scenario(small_nta, random_scenario, (1, 0, 0))
-    apply_random_scenario(small_nta, random_scenario, (0, 1, 0))
-    apply_random_scenario(small_nta, random_scenario, (0, 0, 1))
-
-    apply_random_scenario(small_nta, random_scenario, (1, 1, 0))
-    apply_random_scenario(small_nta, random_scenario, (0, 2, 0))
-    apply_random_scenario(small_nta, random_scenario, (2, 0, 0))
-
-    apply_random_scenario(small_nta, random_scenario, (2, 1, 0))
-    apply_random_scenario(small_nta, random_scenario, (0, 2, 1))
-    apply_random_scenario(small_nta, random_scenario, (2, 1, 0))
-
-    apply_random_scenario(small_nta, random_scenario, (2, 2, 0))
-    apply_random_scenario(small_nta, random_scenario, (0, 3, 1))
-    apply_random_scenario(small_nta, random_scenario, (4, 0, 0))
-
-    apply_random_scenario(small_nta, random_scenario, (2, 2, 1))
-    apply_random_scenario(small_nta, random_scenario, (1, 3, 1))
-    apply_random_scenario(small_nta, random_scenario, (4, 1, 0))
-
-    apply_random_scenario(small_nta, random_scenario, (2, 2, 2))
-    apply_random_scenario(small_nta, random_scenario, (1, 3, 2))
-    apply_random_scenario(small_nta, random_scenario, (4, 1, 1))
-
-    apply_random_scenario(small_nta, random_scenario, (5, 0, 0))
-    apply_random_scenario(small_nta, random_scenario, (4, 1, 0))
-    apply_random_scenario(small_nta, random_scenario, (1, 2, 2))
-
-    apply_random_scenario(small_nta, random_scenario, (2, 2, 2))
-    apply_random_scenario(small_nta, random_scenario, (6, 0, 0))
-    apply_random_scenario(small_nta, random_scenario, (1, 1, 4))
-
-    apply_random_scenario(small_nta, random_scenario, (2, 2, 3))
-    apply_random_scenario(small_nta, random_scenario, (6, 0, 1))
-    apply_random_scenario(small_nta, random_scenario, (1, 2, 4))
-
-    apply_random_scenario(small_nta, random_scenario, (3, 2, 3))
-    apply_random_scenario(small_nta, random_scenario, (6, 1, 1))
-    apply_random_scenario(small_nta, random_scenario, (2, 2, 4))
-
-    apply_random_scenario(small_nta, random_scenario, (3, 3, 3))
-    apply_random_scenario(small_nta, random_scenario, (6, 2, 1))
-    apply_random_scenario(small_nta, random_scenario, (2, 3, 4))
-
-    apply_random_scenario(small_nta, random_scenario, (4, 3, 3))
-    apply_random_scenario(small_nta, random_scenario, (6, 2, 2))
-    apply_random_scenario(small_nta, random_scenario, (2, 3, 5))
-
-    divide()
-    print("SMALL NTA")
-    print("BIG NTA")
-
-    apply_random_scenario(big_nta, random_scenario, (1, 0, 0))
-    apply_random_scenario(big_nta, random_scenario, (0, 1, 0))
-    apply_random_scenario(big_nta, random_scenario, (0, 0, 1))
-
-    apply_random_scenario(big_nta, random_scenario, (1, 1, 0))
-    apply_random_scenario(big_nta, random_scenario, (0, 2, 0))
-    apply_random_scenario(big_nta, random_scenario, (2, 0, 0))
-
-    apply_random_scenario(big_nta, random_scenario, (2, 1, 0))
-    apply_random_scenario(big_nta, random_scenario, (0, 2, 1))
-    apply_random_scenario(big_nta, random_scenario, (2, 1, 0))
-
-    apply_random_scenario(big_nta, random_scenario, (2, 2, 0))
-    apply_random_scenario(big_nta, random_scenario, (0, 3, 1))
-    apply_random_scenario(big_nta, random_scenario, (4, 0, 0))
-
-    apply_random_scenario(big_nta, random_scenario, (2, 2, 1))
-    apply_random_scenario(big_nta, random_scenario, (1, 3, 1))
-    apply_random_scenario(big_nta, random_scenario, (4, 1, 0))
-
-    apply_random_scenario(big_nta, random_scenario, (2, 2, 2))
-    apply_random_scenario(big_nta, random_scenario, (1, 3, 2))
-    apply_random_scenario(big_nta, random_scenario, (4, 1, 1))
-
-    apply_random_scenario(big_nta, random_scenario, (5, 0, 0))
-    apply_random_scenario(big_nta, random_scenario, (4, 1, 0))
-    apply_random_scenario(big_nta, random_scenario, (1, 2, 2))
-
-    apply_random_scenario(big_nta, random_scenario, (2, 2, 2))
-    apply_random_scenario(big_nta, random_scenario, (6, 0, 0))
-    apply_random_scenario(big_nta, random_scenario, (1, 1, 4))
-
-    apply_random_scenario(big_nta, random_scenario, (2, 2, 3))
-    apply_random_scenario(big_nta, random_scenario, (6, 0, 1))
-    apply_random_scenario(big_nta, random_scenario, (1, 2, 4))
-
-    apply_random_scenario(big_nta, random_scenario, (3, 2, 3))
-    apply_random_scenario(big_nta, random_scenario, (6, 1, 1))
-    apply_random_scenario(big_nta, random_scenario, (2, 2, 4))
-
-    apply_random_scenario(big_nta, random_scenario, (3, 3, 3))
-    apply_random_scenario(big_nta, random_scenario, (6, 2, 1))
-    apply_random_scenario(big_nta, random_scenario, (2, 3, 4))
 
-    apply_random_scenario(big_nta, random_scenario, (4, 3, 3))
-    apply_random_scenario(big_nta, random_scenario, (6, 2, 2))
-    apply_random_scenario(big_nta, random_scenario, (2, 3, 5))
+    for name, nta_file in ntas:
+        divide()
+        print(name)
+        for counts in SCENARIOS:
+            apply_random_scenario(nta_file, random_scenario, counts)
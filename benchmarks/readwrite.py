@@ -1,34 +1,61 @@
+import gc
 import os
-import timeit
+import statistics
+import time
 import uppaalpy
 import lxml.etree as LET
-import xml.etree.cElementTree as CET
+import xml.etree.ElementTree as XET
 
 def list_nta_in_dir(directory):
     return [directory.strip('/') + '/' + x \
             for x in os.listdir(directory) if x.endswith('.xml')]
 
+# Each workload is run once to warm up caches, then timed over several runs
+# with the garbage collector disabled. The median is reported, in seconds.
+def measure(fn, arg, runs=5, warmup=1):
+    for _ in range(warmup):
+        fn(arg)
+    times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(runs):
+            start = time.perf_counter_ns()
+            fn(arg)
+            times.append(time.perf_counter_ns() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return statistics.median(times) / 1e9
+
 def benchmark_read(files):
     for f in files:
         _ = uppaalpy.NTA.from_xml(f)
 
+# The output file is opened once, and truncated before each write.
 def benchmark_pretty_print(ntas):
-    for nta in ntas:
-        nta.to_file('/tmp/out_benchmark.xml', pretty=True)
+    with open('/tmp/out_benchmark.xml', 'wb') as out:
+        for nta in ntas:
+            out.seek(0)
+            out.truncate()
+            nta.to_file(out, pretty=True)
 
 def benchmark_write(ntas):
-    for nta in ntas:
-        nta.to_file('/tmp/out_benchmark.xml', pretty=False)
+    with open('/tmp/out_benchmark.xml', 'wb') as out:
+        for nta in ntas:
+            out.seek(0)
+            out.truncate()
+            nta.to_file(out, pretty=False)
 
 def benchmark_lxml_read(files):
     for f in files:
         _ = LET.parse(f)
 
-def benchmark_cet_read(files):
+def benchmark_xet_read(files):
     for f in files:
-        _ = CET.parse(f)
+        _ = XET.parse(f)
 
-# cElementTree and lxml share the same API for writing.
+# ElementTree and lxml share the same API for writing.
 def benchmark_xml_write(trees):
     for tree in trees:
         tree.write('/tmp/out_benchmark.xml')
@@ -39,6 +66,9 @@ def benchmark_xml_write_pretty(trees):
         tree.write('/tmp/out_benchmark.xml', pretty_print=True)
 
 if __name__ == '__main__':
+    # Pin the process to one CPU, where supported, for steadier timings.
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
 
     files = list_nta_in_dir('examples/generator')
     lit_files = list_nta_in_dir('examples/literature')
@@ -46,35 +76,25 @@ if __name__ == '__main__':
     print()
     print("===============================")
     print()
-    print("cElementTree benchmarks")
-    print("Benchmarking cElementTree parse method.")
-
-    start = timeit.default_timer()
-    benchmark_cet_read(files)
-    end = timeit.default_timer()
-
-    start2 = timeit.default_timer()
-    benchmark_cet_read(lit_files)
-    end2 = timeit.default_timer()
-    print("Read \t%s generator files in \t%s seconds." % (len(files), end - start))
-    print("\t%s literature files in \t%s seconds." % (len(lit_files), end2 - start2))
-    print()
+    print("ElementTree benchmarks")
+    print("Benchmarking ElementTree parse method.")
 
-    print("Benchmarking cElementTree write method")
+    elapsed = measure(benchmark_xet_read, files)
+    elapsed2 = measure(benchmark_xet_read, lit_files)
+    print("Read \t%s generator files in \t%s seconds." % (len(files), elapsed))
+    print("\t%s literature files in \t%s seconds." % (len(lit_files), elapsed2))
+    print()
 
-    trees = [CET.parse(f) for f in files]
-    lit_trees = [CET.parse(f) for f in lit_files]
+    print("Benchmarking ElementTree write method")
 
-    start = timeit.default_timer()
-    benchmark_xml_write(trees)
-    end = timeit.default_timer()
+    trees = [XET.parse(f) for f in files]
+    lit_trees = [XET.parse(f) for f in lit_files]
 
-    start2 = timeit.default_timer()
-    benchmark_xml_write(lit_trees)
-    end2 = timeit.default_timer()
+    elapsed = measure(benchmark_xml_write, trees)
+    elapsed2 = measure(benchmark_xml_write, lit_trees)
 
-    print("Wrote \t%s generator files in \t%s seconds." % (len(files), end - start))
-    print("\t%s literature files in \t%s seconds." % (len(lit_files), end2 - start2))
+    print("Wrote \t%s generator files in \t%s seconds." % (len(files), elapsed))
+    print("\t%s literature files in \t%s seconds." % (len(lit_files), elapsed2))
     print()
     print("===============================")
     print()
@@ -82,45 +102,30 @@ if __name__ == '__main__':
     print("lxml benchmarks")
     print("Benchmarking lxml parse method.")
 
-    start = timeit.default_timer()
-    benchmark_lxml_read(files)
-    end = timeit.default_timer()
-
-    start2 = timeit.default_timer()
-    benchmark_lxml_read(lit_files)
-    end2 = timeit.default_timer()
-    print("Read \t%s generator files in \t%s seconds." % (len(files), end - start))
-    print("\t%s literature files in \t%s seconds." % (len(lit_files), end2 - start2))
+    elapsed = measure(benchmark_lxml_read, files)
+    elapsed2 = measure(benchmark_lxml_read, lit_files)
+    print("Read \t%s generator files in \t%s seconds." % (len(files), elapsed))
+    print("\t%s literature files in \t%s seconds." % (len(lit_files), elapsed2))
     print()
 
     trees = [LET.parse(f) for f in files]
     lit_trees = [LET.parse(f) for f in lit_files]
 
     print("Benchmarking lxml write method")
-    start = timeit.default_timer()
-    benchmark_xml_write(trees)
-    end = timeit.default_timer()
-
-    start2 = timeit.default_timer()
-    benchmark_xml_write(lit_trees)
-    end2 = timeit.default_timer()
+    elapsed = measure(benchmark_xml_write, trees)
+    elapsed2 = measure(benchmark_xml_write, lit_trees)
 
-    print("Wrote \t%s generator files in \t%s seconds." % (len(files), end - start))
-    print("\t%s literature files in \t%s seconds." % (len(lit_files), end2 - start2))
+    print("Wrote \t%s generator files in \t%s seconds." % (len(files), elapsed))
+    print("\t%s literature files in \t%s seconds." % (len(lit_files), elapsed2))
     print()
 
 
     print("Benchmarking lxml write method (pretty)")
-    start = timeit.default_timer()
-    benchmark_xml_write_pretty(trees)
-    end = timeit.default_timer()
+    elapsed = measure(benchmark_xml_write_pretty, trees)
+    elapsed2 = measure(benchmark_xml_write_pretty, lit_trees)
 
-    start2 = timeit.default_timer()
-    benchmark_xml_write_pretty(lit_trees)
-    end2 = timeit.default_timer()
-
-    print("Wrote \t%s generator files in \t%s seconds." % (len(files), end - start))
-    print("\t%s literature files in \t%s seconds." % (len(lit_files), end2 - start2))
+    print("Wrote \t%s generator files in \t%s seconds." % (len(files), elapsed))
+    print("\t%s literature files in \t%s seconds." % (len(lit_files), elapsed2))
     print()
     print("===============================")
     print()
@@ -130,46 +135,30 @@ if __name__ == '__main__':
 
 
     print("Benchmarking from_xml method.")
-    start = timeit.default_timer()
-    benchmark_read(files)
-    end = timeit.default_timer()
-
-    start2 = timeit.default_timer()
-    benchmark_read(lit_files)
-    end2 = timeit.default_timer()
-    print("Read \t%s generator files in \t%s seconds." % (len(files), end - start))
-    print("\t%s literature files in \t%s seconds." % (len(lit_files), end2 - start2))
+    elapsed = measure(benchmark_read, files)
+    elapsed2 = measure(benchmark_read, lit_files)
+    print("Read \t%s generator files in \t%s seconds." % (len(files), elapsed))
+    print("\t%s literature files in \t%s seconds." % (len(lit_files), elapsed2))
 
     print()
 
-    ntas = []
-    for f in files:
-        ntas.append(uppaalpy.NTA.from_xml(f))
+    ntas = [uppaalpy.NTA.from_xml(f) for f in files]
+    lit_ntas = [uppaalpy.NTA.from_xml(f) for f in lit_files]
 
     print("Benchmarking to_xml method (ugly).")
-    start = timeit.default_timer()
-    benchmark_write(ntas)
-    end = timeit.default_timer()
+    elapsed = measure(benchmark_write, ntas)
+    elapsed2 = measure(benchmark_write, lit_ntas)
 
-    start2 = timeit.default_timer()
-    benchmark_write(ntas)
-    end2 = timeit.default_timer()
-
-    print("Wrote \t%s generator files in \t%s seconds." % (len(files), end - start))
-    print("\t%s literature files in \t%s seconds." % (len(lit_files), end2 - start2))
+    print("Wrote \t%s generator files in \t%s seconds." % (len(files), elapsed))
+    print("\t%s literature files in \t%s seconds." % (len(lit_files), elapsed2))
 
     print()
 
     print("Benchmarking to_xml method (pretty).")
-    start = timeit.default_timer()
-    benchmark_pretty_print(ntas)
-    end = timeit.default_timer()
-
-    start2 = timeit.default_timer()
-    benchmark_pretty_print(ntas)
-    end2 = timeit.default_timer()
+    elapsed = measure(benchmark_pretty_print, ntas)
+    elapsed2 = measure(benchmark_pretty_print, lit_ntas)
 
-    print("Wrote \t%s generator files in \t%s seconds." % (len(files), end - start))
-    print("\t%s literature files in \t%s seconds." % (len(lit_files), end2 - start2))
+    print("Wrote \t%s generator files in \t%s seconds." % (len(files), elapsed))
+    print("\t%s literature files in \t%s seconds." % (len(lit_files), elapsed2))
 
     print()
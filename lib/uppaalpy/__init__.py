@@ -1,32 +1,86 @@
-from uppaalpy.classes.constraint_patcher import (
-    ConstraintCache,
-    ConstraintChange,
-    ConstraintInsert,
-    ConstraintPatch,
-    ConstraintRemove,
-    ConstraintUpdate,
-)
-from uppaalpy.classes.context import Context, MutableContext
-from uppaalpy.classes.expr import (
-    ClockConstraintExpression,
-    ClockResetExpression,
-    ConstraintExpression,
-    Expression,
-    UpdateExpression,
-)
-from uppaalpy.classes.nodes import BranchPoint, Location, Node
-from uppaalpy.classes.nta import NTA
-from uppaalpy.classes.simplethings import (
-    ConstraintLabel,
-    Declaration,
-    Label,
-    Name,
-    Parameter,
-    Query,
-    SystemDeclaration,
-    UpdateLabel,
-)
-from uppaalpy.classes.tagraph import TAGraph
-from uppaalpy.classes.templates import Template
-from uppaalpy.classes.transitions import Nail, Transition
-from uppaalpy.path_analysis import *
+"""UPPAAL wrapper for Python.
+
+The classes and the path analysis functions are imported lazily on first
+access (PEP 562), so that importing uppaalpy only loads the modules in use.
+For instance, ortools is not imported unless path analysis is used.
+"""
+from importlib import import_module
+
+_modules = {
+    "uppaalpy.classes.constraint_patcher": (
+        "ConstraintCache",
+        "ConstraintChange",
+        "ConstraintInsert",
+        "ConstraintPatch",
+        "ConstraintRemove",
+        "ConstraintUpdate",
+    ),
+    "uppaalpy.classes.context": ("Context", "MutableContext"),
+    "uppaalpy.classes.expr": (
+        "ClockConstraintExpression",
+        "ClockResetExpression",
+        "ConstraintExpression",
+        "Expression",
+        "UpdateExpression",
+    ),
+    "uppaalpy.classes.nodes": ("BranchPoint", "Location", "Node"),
+    "uppaalpy.classes.nta": ("NTA",),
+    "uppaalpy.classes.simplethings": (
+        "ConstraintLabel",
+        "Declaration",
+        "Label",
+        "Name",
+        "Parameter",
+        "Query",
+        "SystemDeclaration",
+        "UpdateLabel",
+    ),
+    "uppaalpy.classes.tagraph": ("TAGraph",),
+    "uppaalpy.classes.templates": ("Template",),
+    "uppaalpy.classes.transitions": ("Nail", "Transition"),
+    "uppaalpy.path_analysis": (
+        "EPS",
+        "LI",
+        "Path",
+        "check_dp",
+        "compute_constraint",
+        "concatenate_paths",
+        "convert_to_path",
+        "find_all_semi_realizable_paths",
+        "find_reachable_locations",
+        "find_used_clocks",
+        "furthest_reachable",
+        "get_resets",
+        "path_exists",
+        "path_realizable",
+        "path_realizable_with_initial_valuation",
+        "reachability_analysis",
+    ),
+}
+
+_lazy_names = {name: module for module, names in _modules.items() for name in names}
+
+# Subpackages and submodules, which are imported on first attribute access.
+_submodules = ("classes", "path_analysis")
+
+__all__ = sorted(_lazy_names)
+
+
+def __getattr__(name: str):
+    """Import the module defining name, and return the attribute.
+
+    Submodules are imported and returned, as after import uppaalpy.<name>.
+    """
+    module = _lazy_names.get(name)
+    if module is None:
+        if name in _submodules:
+            return import_module(__name__ + "." + name)
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(import_module(module), name)
+    globals()[name] = value  # Later lookups do not call __getattr__.
+    return value
+
+
+def __dir__():
+    """List the lazily imported names along with the module attributes."""
+    return sorted(set(globals()) | set(_lazy_names) | set(_submodules))
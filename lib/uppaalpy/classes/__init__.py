@@ -1,10 +1,30 @@
-"""Implementation of classes required for representing UPPAAL TA."""
-from . import constraint_patcher
-from . import context
-from . import expr
-from . import nodes
-from . import nta
-from . import simplethings
-from . import tagraph
-from . import templates
-from . import transitions
+"""Implementation of classes required for representing UPPAAL TA.
+
+Submodules are imported lazily on first attribute access (PEP 562), e.g.
+uppaalpy.classes.nta, or on demand, e.g. from uppaalpy.classes import nta.
+"""
+from importlib import import_module
+
+_submodules = (
+    "constraint_patcher",
+    "context",
+    "expr",
+    "nodes",
+    "nta",
+    "simplethings",
+    "tagraph",
+    "templates",
+    "transitions",
+)
+
+
+def __getattr__(name: str):
+    """Import the submodule name, and return it."""
+    if name not in _submodules:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    return import_module(__name__ + "." + name)
+
+
+def __dir__():
+    """List the lazily imported submodules along with the module attributes."""
+    return sorted(set(globals()) | set(_submodules))
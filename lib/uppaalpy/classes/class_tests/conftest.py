@@ -0,0 +1,46 @@
+"""Fixtures shared by the unit tests."""
+from copy import deepcopy
+from functools import lru_cache
+
+import lxml.etree as ET
+import pytest
+
+from uppaalpy.classes.class_tests.helpers import testcase_dir
+from uppaalpy.classes.class_tests.test_context_cases import DataContext
+from uppaalpy.classes.nta import NTA
+
+
+@pytest.fixture(scope="session")
+def ctx():
+    """Return the Context of DataContext, built once per test session.
+
+    Contexts are immutable, so the tests can share one.
+    """
+    return DataContext.ctx()
+
+
+@pytest.fixture(scope="session")
+def shared_nta():
+    """Return a function reading an NTA from a path, once per test session.
+
+    The NTAs are shared, so tests that change them must call NTA.from_xml
+    instead. Copying an NTA with deepcopy takes longer than reading it again.
+    """
+    return lru_cache(maxsize=None)(NTA.from_xml)
+
+
+@pytest.fixture(scope="session")
+def _template_roots():
+    """Return the roots of template_xml_files/test<i>.xml, parsed once."""
+    parser = ET.XMLParser(huge_tree=True, collect_ids=False, remove_comments=True)
+    path = testcase_dir + "template_xml_files/test%d.xml"
+    return {i: ET.parse(path % i, parser).getroot() for i in range(1, 5)}
+
+
+@pytest.fixture
+def template_root(_template_roots):
+    """Return a function returning a copy of the root of test<i>.xml.
+
+    Copying an element tree is faster than parsing its file again.
+    """
+    return lambda i: deepcopy(_template_roots[i])
@@ -1,121 +1,171 @@
-"""Helpers for making random changes on NTA."""
-#TODO: Reimplement this module
+"""Helpers for making random changes on NTA.
+
+Random choices are drawn in batches from flat lists of the changeable
+transitions and locations, which are computed once per scenario. Removals
+and updates share one pool of objects with clock constraints, and removals
+keep it up to date, so no object is drawn and then rejected. The loops bind
+the functions they call to local names.
+"""
+
+from random import choice, choices, randrange
+from typing import Dict, List, Union
 
-import random
 from uppaalpy import NTA
-from uppaalpy.classes.expr import ClockConstraintExpression
+from uppaalpy.classes.context import Context
+from uppaalpy.classes.expr import ClockConstraintExpression, ConstraintExpression
+from uppaalpy.classes.nodes import Location
+from uppaalpy.classes.templates import Template
+from uppaalpy.classes.transitions import Transition
 
+Changeable = Union[Location, Transition]
 
 
-def select_random_transition(nta, nonempty=False):
-    """Select a random transition.
+def changeable_objects(nta: NTA) -> List[Changeable]:
+    """Return the transitions and locations of all templates in a flat list."""
+    res = []  # type: List[Changeable]
+    for t in nta.templates:
+        res.extend(t.graph._transitions)
+        res.extend(n for n in t.graph.get_nodes() if isinstance(n, Location))
+    return res
 
-    If nonempty is True, keep selecting until one with constraints is found.
-    """
-    while True:
-        t = random.choice(nta.templates)
-        trans = random.choice(t.graph._transitions)
-        if not (nonempty and trans.guard is None):
-            break
 
-    return trans
+def clock_constraints(obj: Changeable) -> List[ClockConstraintExpression]:
+    """Return the clock constraints on a transition or a location."""
+    return [
+        c for c in obj.get_constraints() if isinstance(c, ClockConstraintExpression)
+    ]
 
 
-def select_random_location(nta, nonempty=False):
-    """Select a random location.
+def constrained_objects(objs: List[Changeable]) -> List[Changeable]:
+    """Return the objects with at least one clock constraint."""
+    return [obj for obj in objs if clock_constraints(obj)]
 
-    If nonempty is True, keep selecting until one with constraints is found.
-    """
-    while True:
-        t = random.choice(nta.templates)
-        locs = t.graph.get_nodes()
-        loc = random.choice(locs)
-        if not (nonempty and loc.invariant is None):
-            break
-
-    return loc
-
-
-def make_random_insert(nta):
-    """Insert a random constraint to a random transition or location."""
-    change_transition = random.choice([True, False])
-    ctx = nta.context
-
-    if change_transition:
-        trans = select_random_transition(nta)
-        nta.change_transition_constraint(
-            trans,
-            operation="insert",
-            simple_constraint=ClockConstraintExpression(
-                "c" + random.choice(["<", ">"]) + str(random.randint(1, 100)), ctx
-            ),
-        )
 
-    else:
-        location = select_random_location(nta)
-        nta.change_location_constraint(
-            location,
-            operation="insert",
-            simple_constraint=SCConstraint(
-                ["x"], random.choice(["<", ">"]), random.randint(1, 100)
-            ),
+def template_contexts(nta: NTA) -> Dict[Template, Context]:
+    """Map each template to a Context with its global and local declarations."""
+    res = {}
+    for t in nta.templates:
+        local = Context.parse_context(
+            t.declaration.text if t.declaration is not None else None
+        )
+        res[t] = Context(
+            nta.context.clocks | local.clocks,
+            {**nta.context.constants, **local.constants},
+            {**nta.context.initial_state, **local.initial_state},
         )
+    return res
 
 
-def make_random_remove(nta):
-    """Remove a random constraint from a random transition or location."""
-    change_transition = random.choice([True, False])
+def reparse_constraints(
+    objs: List[Changeable], contexts: Dict[Template, Context]
+) -> None:
+    """Parse the constraints of objs again with the contexts of their templates.
 
-    if change_transition:
-        trans = select_random_transition(nta, nonempty=True)
-        nta.change_transition_constraint(
-            trans,
-            operation="remove",
-            simple_constraint=random.choice(trans.guard.constraints),
+    NTA.from_xml parses labels with the global context only, so constraints
+    on template-local clocks are read as plain ConstraintExpressions, which
+    can not be removed or updated with NTA.change_clock_constraint.
+    """
+    for obj in objs:
+        label = obj.get_constraint_label()
+        if label is not None:
+            ctx = contexts[obj.template]
+            label.constraints = [
+                ConstraintExpression.parse_expr(c.to_string(), ctx)
+                for c in label.constraints
+            ]
+
+
+def increment(delta: int):
+    """Return a threshold function adding delta to integer thresholds."""
+    return lambda x: str(int(x) + delta) if Context.is_literal(x) else x
+
+
+def make_random_inserts(
+    nta: NTA,
+    objs: List[Changeable],
+    contexts: Dict[Template, Context],
+    count: int,
+) -> None:
+    """Insert count random constraints to random transitions or locations.
+
+    contexts is a dict from template_contexts. Constraints are built with
+    the context of the template of the changed object.
+    """
+    clocks = {t: sorted(ctx.clocks) or ["x"] for t, ctx in contexts.items()}
+    targets = choices(objs, k=count)
+    operators = choices(["<", ">"], k=count)
+    thresholds = choices(range(1, 101), k=count)
+    change, _choice = nta.change_clock_constraint, choice
+
+    for obj, op, threshold in zip(targets, operators, thresholds):
+        template = obj.template
+        clock = _choice(clocks[template])
+        change(
+            obj,
+            "insert",
+            ClockConstraintExpression(
+                "{} {} {}".format(clock, op, threshold), contexts[template]
+            ),
         )
 
-    else:
-        location = select_random_location(nta, nonempty=True)
-        nta.change_location_constraint(
-            location,
-            operation="remove",
-            simple_constraint=random.choice(location.invariant.constraints),
-        )
 
+def make_random_removes(nta: NTA, pool: List[Changeable], count: int) -> None:
+    """Remove count random clock constraints from transitions or locations.
 
-def make_random_update(nta):
-    """Update a random constraint from a random transition or location."""
-    change_transition = random.choice([True, False])
+    pool is a list from constrained_objects. Objects left with no clock
+    constraints are removed from it in constant time, by swapping them with
+    the last object. Raises ValueError if the pool runs out.
+    """
+    change, _choice, _randrange = nta.change_clock_constraint, choice, randrange
 
-    if change_transition:
-        trans = select_random_transition(nta, nonempty=True)
-        nta.change_transition_constraint(
-            trans,
-            operation="update",
-            simple_constraint=random.choice(trans.guard.constraints),
-            threshold_delta=random.randint(1, 10),
-        )
+    for _ in range(count):
+        if not pool:
+            raise ValueError("no constrained objects left")
+        i = _randrange(len(pool))
+        obj = pool[i]
+        constraints = clock_constraints(obj)
+        change(obj, "remove", _choice(constraints))
+        if len(constraints) == 1:  # Nothing left to remove on obj.
+            pool[i] = pool[-1]
+            pool.pop()
+
+
+def make_random_updates(nta: NTA, pool: List[Changeable], count: int) -> None:
+    """Update count random clock constraints on transitions or locations.
 
-    else:
-        location = select_random_location(nta, nonempty=True)
-        nta.change_location_constraint(
-            location,
-            operation="update",
-            simple_constraint=random.choice(location.invariant.constraints),
-            threshold_delta=random.randint(1, 10),
+    pool is a list from constrained_objects. Raises ValueError if count is
+    positive and the pool is empty.
+    """
+    if count and not pool:
+        raise ValueError("no constrained objects left")
+
+    targets = choices(pool, k=count)
+    deltas = choices(range(1, 11), k=count)
+    change, _choice = nta.change_clock_constraint, choice
+
+    for obj, delta in zip(targets, deltas):
+        change(
+            obj,
+            "update",
+            _choice(clock_constraints(obj)),
+            threshold_function=increment(delta),
         )
 
 
 def random_scenario(nta_file, insert_count, remove_count, update_count):
-    """Apply random changes for each given change type."""
-    nta = NTA.from_xml(nta_file)
-    for _ in range(insert_count):
-        make_random_insert(nta)
-
-    for _ in range(remove_count):
-        make_random_remove(nta)
+    """Apply random changes for each given change type.
 
-    for _ in range(update_count):
-        make_random_update(nta)
+    The constraints of the NTA are parsed again with the contexts of their
+    templates first, so that clocks declared in templates can be changed.
+    """
+    nta = NTA.from_xml(nta_file)
+    contexts = template_contexts(nta)
+    objs = changeable_objects(nta)
+    reparse_constraints(objs, contexts)
+
+    make_random_inserts(nta, objs, contexts, insert_count)
+    pool = constrained_objects(objs)
+    make_random_removes(nta, pool, remove_count)
+    make_random_updates(nta, pool, update_count)
 
     return nta
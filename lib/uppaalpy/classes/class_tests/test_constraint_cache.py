@@ -3,7 +3,14 @@
 A complete NTA object is required to test these classes.
 """
 
-from uppaalpy.classes.constraint_patcher import ConstraintPatch, ConstraintUpdate
+import lxml.etree as ET
+
+from uppaalpy.classes.constraint_patcher import (
+    ConstraintPatch,
+    ConstraintRemove,
+    ConstraintUpdate,
+)
+from uppaalpy.classes.expr import ClockConstraintExpression
 from uppaalpy.classes.nta import NTA
 
 from .helpers import testcase_dir
@@ -108,3 +115,135 @@ class TestConstraintCache:
         assert lines[:56] == lines_subject_to_change[:56]
         assert lines[57:] == lines_subject_to_change[57:]
         assert lines[56].replace("10", "15") == lines_subject_to_change[56]
+
+    @staticmethod
+    def test_constraint_cache_apply_patches():
+        """Test that apply_patches matches applying the patches one by one."""
+        nta = NTA.from_xml(testcase_dir + "constraint_cache_xml_files/test01.xml")
+        cc = nta.patch_cache
+        first, second = nta.templates
+
+        # Cache changes in the reverse order of their objects in the file.
+        objs = [
+            second.graph._transitions[0],
+            first.graph._transitions[3],
+            first.graph._transitions[1],
+            first.graph._transitions[0],
+            first.graph._named_locations["l0"],
+        ]
+        for obj in objs:
+            nta.change_clock_constraint(
+                obj, "insert", ClockConstraintExpression("y < 3", nta.context)
+            )
+            label = obj.get_constraint_label()
+            nta.change_clock_constraint(
+                obj,
+                "update",
+                label.constraints[0],
+                threshold_function=lambda _: "42",
+            )
+
+        lines = open(testcase_dir + "constraint_cache_xml_files/test01.xml").readlines()
+        expected = lines[:]
+        for patch in cc.patches:
+            cc._apply_single_patch(expected, patch)
+
+        cc.apply_patches(lines)
+        assert lines == expected
+
+    @staticmethod
+    def test_constraint_cache_patch_unevenly_spaced():
+        """Test patching constraints that are not spaced as in to_string."""
+        nta = NTA.from_xml(testcase_dir + "constraint_cache_xml_files/test01.xml")
+        expr = ClockConstraintExpression("x <= 10", nta.context)
+        line = '\t\t\t<label kind="guard" x="0" y="0">y&gt;3 &amp;&amp; x&lt;=  10</label>\n'
+
+        lines = [line]
+        ConstraintUpdate(expr, "15").patch_line(lines, 0)
+        assert lines == [line.replace("10", "15")]
+
+        lines = [line]
+        ConstraintRemove(expr).patch_line(lines, 0)
+        assert lines == ['\t\t\t<label kind="guard" x="0" y="0">y&gt;3</label>\n']
+
+    @staticmethod
+    def test_constraint_cache_patch_unescaped():
+        """Test patching constraints with unescaped '>' characters."""
+        nta = NTA.from_xml(testcase_dir + "constraint_cache_xml_files/test01.xml")
+        expr = ClockConstraintExpression("x >= 10", nta.context)
+        line = '\t\t\t<label kind="guard" x="0" y="0">x >= 10 &amp;&amp; y &lt; 3</label>\n'
+
+        lines = [line]
+        ConstraintRemove(expr).patch_line(lines, 0)
+        assert lines == ['\t\t\t<label kind="guard" x="0" y="0">y &lt; 3</label>\n']
+
+    @staticmethod
+    def test_constraint_cache_apply_patches_same_object():
+        """Test patches that remove and recreate the label of one object."""
+        nta = NTA.from_xml(testcase_dir + "constraint_cache_xml_files/test01.xml")
+        cc = nta.patch_cache
+        loc = nta.templates[0].graph._named_locations["l0"]
+
+        nta.change_clock_constraint(loc, "remove", loc.invariant.constraints[0])
+        nta.change_clock_constraint(
+            loc, "insert", ClockConstraintExpression("y < 3", nta.context)
+        )
+        nta.change_clock_constraint(
+            loc, "insert", ClockConstraintExpression("x > 1", nta.context)
+        )
+        nta.change_clock_constraint(
+            loc,
+            "update",
+            loc.invariant.constraints[1],
+            threshold_function=lambda _: "42",
+        )
+
+        lines = open(testcase_dir + "constraint_cache_xml_files/test01.xml").readlines()
+        expected = lines[:]
+        for patch in cc.patches:
+            cc._apply_single_patch(expected, patch)
+
+        cc.apply_patches(lines)
+        assert lines == expected
+        assert lines[17].strip() == '<name x="-10" y="-34">l0</name>'
+        assert lines[18].strip().endswith(">y &lt; 3 &amp;&amp; x &gt; 42</label>")
+
+    @staticmethod
+    def test_constraint_cache_apply_tree():
+        """Test that apply_tree matches apply_patches."""
+        path = testcase_dir + "constraint_cache_xml_files/test01.xml"
+        nta = NTA.from_xml(path)
+        cc = nta.patch_cache
+        first, second = nta.templates
+        ctx = nta.context
+
+        loc = first.graph._named_locations["l0"]
+        nta.change_clock_constraint(loc, "remove", loc.invariant.constraints[0])
+        nta.change_clock_constraint(
+            loc, "insert", ClockConstraintExpression("y < 3", ctx)
+        )
+        for trans in first.graph._transitions[:2] + second.graph._transitions[:1]:
+            nta.change_clock_constraint(
+                trans, "insert", ClockConstraintExpression("x > 1", ctx)
+            )
+            nta.change_clock_constraint(
+                trans,
+                "update",
+                trans.guard.constraints[-1],
+                threshold_function=lambda _: "42",
+            )
+
+        lines = open(path).readlines()
+        cc.apply_patches(lines)
+        expected = ET.tostring(ET.fromstring("".join(lines).encode("utf-8")))
+
+        tree = ET.parse(path)
+        assert cc.apply_tree(tree) is tree
+        assert ET.tostring(tree.getroot()) == expected
+
+        # Formatting does not matter for the tree.
+        parser = ET.XMLParser(remove_blank_text=True)
+        tree = ET.parse(path, parser)
+        cc.apply_tree(tree)
+        labels = tree.getroot().findall("template/location/label[@kind='invariant']")
+        assert [label.text for label in labels[:2]] == ["y > 7", "y < 3"]
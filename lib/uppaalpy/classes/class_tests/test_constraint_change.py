@@ -1,17 +1,22 @@
-"""Unit tests for ConstraintChange and its subclasses."""
+"""Unit tests for ConstraintChange and its subclasses.
+
+The tests are module-level functions, so that pytest-xdist can spread them
+over its workers one by one, even with --dist loadscope.
+"""
 
 import pytest
-from pytest_cases.case_parametrizer_new import parametrize_with_cases
 
 from uppaalpy.classes.class_tests.test_constraint_change_cases import (
-    CaseCRInit,
-    CaseIPatch,
-    CaseIinit,
-    CaseRFind,
-    CaseRPatch,
-    CaseUFind,
-    CaseUInit,
-    CaseUPatch,
+    C_GT_15,
+    INSERT_INIT,
+    INSERT_PATCH,
+    NOT_FOUND,
+    REMOVE_FIND,
+    REMOVE_INIT,
+    REMOVE_PATCH,
+    UPDATE_FIND,
+    UPDATE_INIT,
+    UPDATE_PATCH,
 )
 from uppaalpy.classes.constraint_patcher import (
     ConstraintInsert,
@@ -19,71 +24,75 @@ from uppaalpy.classes.constraint_patcher import (
 )
 
 
-class TestConstraintRemove:
-    @parametrize_with_cases("exp, rem", cases=CaseCRInit)
-    def test_init(self, exp, rem):
-        if rem == None:
-            cr = ConstraintRemove(exp)
-            assert cr.remove_label == False
-        else:
-            cr = ConstraintRemove(exp, remove_label=rem)
-            assert cr.remove_label == rem
-
-        assert cr.constraint == exp
-
-    @parametrize_with_cases("exp, lst, res", cases=CaseRFind)
-    def test_find(self, exp, lst, res):
-        cr = ConstraintRemove(exp)
-
-        if res == -1:
-            with pytest.raises(Exception):
-                assert cr._find_matching_constraint(lst)
-        else:
-            assert cr._find_matching_constraint(lst) == res
-
-    @parametrize_with_cases("cr, lines, index, res", cases=CaseRPatch)
-    def test_patch(self, cr, lines, index, res):
-        cr.patch_line(lines, index)
-        assert lines == res
-
-
-class TestConstraintInsert:
-    """Unit tests for ConstraintInsert."""
-
-    @parametrize_with_cases("obj, new_label", cases=CaseIinit)
-    def test_constraint_insert_init(self, obj, new_label):
-        """Test ConstraintInsert()."""
-        ci = ConstraintInsert(obj, new_label)
-        assert ci.constraint == obj
-
-    @parametrize_with_cases("ci, lines, res, i, pi", cases=CaseIPatch)
-    def test_patch(self, ci, lines, res, i, pi):
-        ci.patch_line(lines, i, pi)
-        assert len(lines) == len(res)
-        for l, r in zip(lines, res):
-            assert l == r
-
-class TestConstraintUpdate:
-    """Unit tests for ConstraintUpdate."""
-
-    @parametrize_with_cases("c, update, old, new", cases=CaseUInit)
-    def test_constraint_update_init(self, c, update, old, new):
-        """Test ConstraintUpdate()."""
-
-        assert update.constraint == c
-        assert update.old == old
-        assert update.new == new
-
-    @parametrize_with_cases("cu, exprs, res", cases=CaseUFind)
-    def test_constraint_update_find(self, cu, exprs, res):
-        if res is not None:
-            assert cu._find_matching_constraint(exprs) == res
-        else:
-            with pytest.raises(Exception):
-                assert cu._find_matching_constraint(exprs)
-
-
-    @parametrize_with_cases("cu, lines, index, res", cases=CaseUPatch)
-    def test_constraint_update_patch(self, cu, lines, index, res):
-        cu.patch_line(lines, index)
-        assert lines == res
+def test_constraint_remove_init_default():
+    """Test that ConstraintRemove() keeps the label by default."""
+    cr = ConstraintRemove(C_GT_15)
+    assert cr.remove_label is False
+    assert cr.constraint is C_GT_15
+
+
+@pytest.mark.parametrize("exp, rem", REMOVE_INIT)
+def test_constraint_remove_init(exp, rem):
+    """Test ConstraintRemove()."""
+    cr = ConstraintRemove(exp, rem)
+    assert cr.remove_label is rem
+    assert cr.constraint is exp
+
+
+@pytest.mark.parametrize("cr, lst, res", REMOVE_FIND)
+def test_constraint_remove_find(cr, lst, res):
+    """Test ConstraintRemove._find_matching_constraint()."""
+    if res is NOT_FOUND:
+        with pytest.raises(Exception):
+            cr._find_matching_constraint(list(lst))
+    else:
+        assert cr._find_matching_constraint(list(lst)) == res
+
+
+@pytest.mark.parametrize("cr, lines, index, res", REMOVE_PATCH)
+def test_constraint_remove_patch(cr, lines, index, res):
+    """Test ConstraintRemove.patch_line()."""
+    lines = list(lines)
+    cr.patch_line(lines, index)
+    assert lines == list(res)
+
+
+@pytest.mark.parametrize("obj, new_label", INSERT_INIT)
+def test_constraint_insert_init(obj, new_label):
+    """Test ConstraintInsert()."""
+    ci = ConstraintInsert(obj, new_label)
+    assert ci.constraint == obj
+
+
+@pytest.mark.parametrize("ci, lines, res, i, pi", INSERT_PATCH)
+def test_constraint_insert_patch(ci, lines, res, i, pi):
+    """Test ConstraintInsert.patch_line()."""
+    lines = list(lines)
+    ci.patch_line(lines, i, pi)
+    assert lines == list(res)
+
+
+@pytest.mark.parametrize("c, update, old, new", UPDATE_INIT)
+def test_constraint_update_init(c, update, old, new):
+    """Test ConstraintUpdate()."""
+    assert update.constraint == c
+    assert update.old == old
+    assert update.new == new
+
+
+@pytest.mark.parametrize("cu, exprs, res", UPDATE_FIND)
+def test_constraint_update_find(cu, exprs, res):
+    """Test ConstraintUpdate._find_matching_constraint()."""
+    if res is NOT_FOUND:
+        with pytest.raises(Exception):
+            cu._find_matching_constraint(list(exprs))
+    else:
+        assert cu._find_matching_constraint(list(exprs)) == res
+
+
+@pytest.mark.parametrize("cu, lines, index, res", UPDATE_PATCH)
+def test_constraint_update_patch(cu, lines, index, res):
+    """Test ConstraintUpdate.patch_line()."""
+    lines = list(lines)
+    cu.patch_line(lines, index)
+    assert lines == list(res)
@@ -1,288 +1,209 @@
-from uppaalpy.classes.class_tests.test_context_cases import DataContext
-from uppaalpy.classes.constraint_patcher import ConstraintInsert, ConstraintRemove, ConstraintUpdate
-from uppaalpy.classes.expr import ClockConstraintExpression
-from uppaalpy.classes.simplethings import ConstraintLabel
-
-
-class CaseCRInit:
-    class C(DataContext):
-        pass
-
-    def case_01(self):
-        return ClockConstraintExpression("c > 15", self.C.ctx()), False
-
-    def case_02(self):
-        return ClockConstraintExpression("c > 15", self.C.ctx()), True
-
-    def case_03(self):
-        return ClockConstraintExpression("c > 15", self.C.ctx()), None
-
-
-class CaseRFind:
-    class C(DataContext):
-        pass
-
-    def case_01(self):
-        return ClockConstraintExpression("c == 15", self.C.ctx()), ["c == 15"], 0
-
-    def case_02(self):
-        return (
-            ClockConstraintExpression("c == 15", self.C.ctx()),
-            ["c == 15", "c1 > 13"],
-            0,
-        )
-
-    def case_03(self):
-        return (
-            ClockConstraintExpression("c == 15", self.C.ctx()),
-            ["c1 > 13", "c == 15"],
-            1,
-        )
-
-    def case_04(self):
-        return (
-            ClockConstraintExpression("c == 15", self.C.ctx()),
-            ["c1 > 13", "c2 == 15"],
-            -1,
-        )
-
-    def case_05(self):
-        return ClockConstraintExpression("c == 15", self.C.ctx()), [], -1
-
-
-class CaseRPatch:
-    class C(DataContext):
-        pass
-
-    def case_01(self):
-        lines = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="invariant" x="18" y="-34">c &lt; 5 &amp;&amp; i &lt; 5</label>\n',
-            "		</location>\n",
-        ]
-        res = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="invariant" x="18" y="-34">i &lt; 5</label>\n',
-            "		</location>\n",
-        ]
-        expr = ClockConstraintExpression("c < 5", self.C.ctx())
-        cr = ConstraintRemove(expr, False)
-
-        return cr, lines, 1, res
-
-    def case_02(self):
-        lines = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="invariant" x="18" y="-34">c &lt; 5</label>\n',
-            "		</location>\n",
-        ]
-        res = [
-            '		<location id="id0" x="0" y="0">\n',
-            "		</location>\n",
-        ]
-        expr = ClockConstraintExpression("c < 5", self.C.ctx())
-        cr = ConstraintRemove(expr, True)
-
-        return cr, lines, 1, res
-
-    def case_03(self):
-        lines = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="name" x="18" y="-34">location0</label>\n',
-            '			<label kind="invariant" x="18" y="-34">c &lt; 5</label>\n',
-            "		</location>\n",
-        ]
-
-        res = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="name" x="18" y="-34">location0</label>\n',
-            "		</location>\n",
-        ]
-
-        expr = ClockConstraintExpression("c < 5", self.C.ctx())
-        cr = ConstraintRemove(expr, True)
-
-        return cr, lines, 2, res
-
-    def case_04(self):
-        lines = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="name" x="18" y="-34">location0</label>\n',
-            '			<label kind="invariant" x="18" y="-34">c &lt; 5</label>\n',
-            '			<label kind="exponentialrate" x="18" y="-34">foo</label>\n',
-            "		</location>\n",
-        ]
-        res = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="name" x="18" y="-34">location0</label>\n',
-            '			<label kind="exponentialrate" x="18" y="-34">foo</label>\n',
-            "		</location>\n",
-        ]
-
-        expr = ClockConstraintExpression("c < 5", self.C.ctx())
-        cr = ConstraintRemove(expr, True)
-
-        return cr, lines, 2, res
-
-    def case_05(self):
-        lines = [
-            "		<transition>\n",
-            '			<source ref="id0"/>\n',
-            '			<source ref="id1"/>\n',
-            '			<label kind="guard" x="18" y="-34">5 == c</label>\n',
-            "		</transition>\n",
-        ]
-        res = [
-            "		<transition>\n",
-            '			<source ref="id0"/>\n',
-            '			<source ref="id1"/>\n',
-            "		</transition>\n",
-        ]
-        expr = ClockConstraintExpression("5 == c", self.C.ctx())
-        cr = ConstraintRemove(expr, True)
-
-        return cr, lines, 3, res
-
-
-class CaseIinit:
-    class C(DataContext):
-        pass
+"""Cases for the unit tests in test_constraint_change.py.
 
-    def case_01(self):
-        return ClockConstraintExpression("c > 15", self.C.ctx()), None
+Each list holds the arguments of one parametrized test. Lines of xml files
+are kept in tuples, and the tests copy them into lists before patching.
+The lines are interned, so the lines the patches leave as they are compare
+equal by identity.
+"""
+from functools import lru_cache
+from sys import intern
 
+import pytest
 
-class CaseIPatch:
-    class C(DataContext):
-        pass
-
-    def case_01(self):
-        lines = [
-            '		<location id="id0" x="0" y="0">\n',
-            "		</location>\n",
-        ]
-
-        lines_expected = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="invariant" x="18" y="-34">c1 - c &lt;= 5</label>\n',
-            "		</location>\n",
-        ]
-
-        expr = ClockConstraintExpression("c1 - c <= 5", self.C.ctx())
-        invariant = ConstraintLabel("invariant", "", (18, -34), self.C.ctx(), [expr])
-        ci = ConstraintInsert(expr, invariant)
-
-        return ci, lines, lines_expected, 0, 0
-
-
-    def case_02(self):
-        lines = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="invariant" x="18" y="-34">x - y &lt;= 5</label>\n',
-            "		</location>\n",
-        ]
-
-        lines_expected = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="invariant" x="18" y="-34">x - y &lt;= 5 &amp;&amp; c == 3</label>\n',
-            "		</location>\n",
-        ]
-
-        expr = ClockConstraintExpression("c == 3", self.C.ctx())
-        ci = ConstraintInsert(expr)
-
-        return ci, lines, lines_expected, 1, 0
-
-    def case_03(self):
-        lines = [
-            "		<transition>\n",
-            '			<source ref="id0"/>\n',
-            '			<source ref="id1"/>\n',
-            "		</transition>\n",
-        ]
-
-        lines_expected = [
-            "		<transition>\n",
-            '			<source ref="id0"/>\n',
-            '			<source ref="id1"/>\n',
-            '			<label kind="guard" x="18" y="-34">c == 5</label>\n',
-            "		</transition>\n",
-        ]
-
-        expr = ClockConstraintExpression("c == 5", self.C.ctx())
-        guard = ConstraintLabel("guard", "", (18, -34), self.C.ctx(), [expr])
-        ci = ConstraintInsert(expr, guard)
-
-        return ci, lines, lines_expected, 2, 0
-
-    def case_04(self):
-        lines = [
-            "		<transition>\n",
-            '			<source ref="id0"/>\n',
-            '			<source ref="id1"/>\n',
-            '			<label kind="guard" x="18" y="-34">clock2 == 5</label>\n',
-            '			<label kind="synchronisation" x="18" y="-34">foo</label>\n',
-            "		</transition>\n",
-        ]
-
-        lines_expected = [
-            "		<transition>\n",
-            '			<source ref="id0"/>\n',
-            '			<source ref="id1"/>\n',
-            '			<label kind="guard" x="18" y="-34">clock2 == 5 &amp;&amp; c == 5</label>\n',
-            '			<label kind="synchronisation" x="18" y="-34">foo</label>\n',
-            "		</transition>\n",
-        ]
-
-        expr = ClockConstraintExpression("c == 5", self.C.ctx())
-        ci = ConstraintInsert(expr)
-
-        return ci, lines, lines_expected, 3, 0
-
-class CaseUInit:
-    class C(DataContext):
-        pass
-
-    def case_01(self):
-        c = ClockConstraintExpression("c == 3", self.C.ctx())
-        cu = ConstraintUpdate(c, "11")
-
-        return c, cu, "3", "11"
-
-class CaseUFind:
-    class C(DataContext):
-        pass
-    c = ClockConstraintExpression("c > 10", C.ctx())
-    cu = ConstraintUpdate(c, "13")
-
-    def case_01(self):
-        return self.cu, ["c &gt; 10"], 0
-
-    def case_02(self):
-        return self.cu, ["c1 == 10", "c &gt; 10"], 1
-
-    def case_03(self):
-        return self.cu, ["c1 &gt; 13"], None
-
-class CaseUPatch:
-    class C(DataContext):
-        pass
-
-    def case_01(self):
-        lines = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="invariant" x="18" y="-34">c &lt; 5 &amp;&amp; y &lt; 5</label>\n',
-            "		</location>\n",
-        ]
-
-        lines_expected = [
-            '		<location id="id0" x="0" y="0">\n',
-            '			<label kind="invariant" x="18" y="-34">c &lt; 10 &amp;&amp; y &lt; 5</label>\n',
-            "		</location>\n",
-        ]
-
-        c = ClockConstraintExpression("c < 5", self.C.ctx())
-        cu = ConstraintUpdate(c, "10")
-
-        return cu, lines, 1, lines_expected
+from uppaalpy.classes.class_tests.test_context_cases import DataContext
+from uppaalpy.classes.constraint_patcher import (
+    ConstraintInsert,
+    ConstraintRemove,
+    ConstraintUpdate,
+)
+from uppaalpy.classes.expr import ClockConstraintExpression
+from uppaalpy.classes.simplethings import ConstraintLabel
 
+CTX = DataContext.ctx()
+
+# Expected result of the find cases with no matching constraint.
+NOT_FOUND = object()
+
+LOCATION_START = intern('\t\t<location id="id0" x="0" y="0">\n')
+LOCATION_END = intern("\t\t</location>\n")
+TRANSITION_START = (
+    intern("\t\t<transition>\n"),
+    intern('\t\t\t<source ref="id0"/>\n'),
+    intern('\t\t\t<source ref="id1"/>\n'),
+)
+TRANSITION_END = intern("\t\t</transition>\n")
+
+
+@lru_cache(maxsize=None)
+def cc(string):
+    """Return a ClockConstraintExpression in the test context.
+
+    Expressions are parsed once per string, and shared by the cases that use
+    them. Neither the changes nor the tests modify the expressions.
+    """
+    return ClockConstraintExpression(string, CTX)
+
+
+def label(kind, text):
+    """Return the line of a label with the given kind and text."""
+    return intern('\t\t\t<label kind="%s" x="18" y="-34">%s</label>\n' % (kind, text))
+
+
+def location(*labels):
+    """Return the lines of a location with the given label lines."""
+    return (LOCATION_START,) + labels + (LOCATION_END,)
+
+
+def transition(*labels):
+    """Return the lines of a transition with the given label lines."""
+    return TRANSITION_START + labels + (TRANSITION_END,)
+
+
+# Expressions shared by the cases.
+C_GT_15 = cc("c > 15")
+C_EQ_15 = cc("c == 15")
+C_LT_5 = cc("c < 5")
+C_EQ_5 = cc("c == 5")
+C_EQ_3 = cc("c == 3")
+C1_MINUS_C_LE_5 = cc("c1 - c <= 5")
+
+# (exp, rem)
+REMOVE_INIT = [(C_GT_15, False), (C_GT_15, True)]
+
+_remove = ConstraintRemove(C_EQ_15)
+
+# (cr, lst, res)
+REMOVE_FIND = [
+    (_remove, ("c == 15",), 0),
+    (_remove, ("c == 15", "c1 > 13"), 0),
+    (_remove, ("c1 > 13", "c == 15"), 1),
+    (_remove, ("c1 > 13", "c2 == 15"), NOT_FOUND),
+    (_remove, (), NOT_FOUND),
+]
+
+# (cr, lines, index, res)
+REMOVE_PATCH = [
+    pytest.param(
+        ConstraintRemove(C_LT_5, False),
+        location(label("invariant", "c &lt; 5 &amp;&amp; i &lt; 5")),
+        1,
+        location(label("invariant", "i &lt; 5")),
+        id="invariant/keep_label",
+    ),
+    pytest.param(
+        ConstraintRemove(C_LT_5, True),
+        location(label("invariant", "c &lt; 5")),
+        1,
+        location(),
+        id="invariant/remove_label",
+    ),
+    pytest.param(
+        ConstraintRemove(C_LT_5, True),
+        location(label("name", "location0"), label("invariant", "c &lt; 5")),
+        2,
+        location(label("name", "location0")),
+        id="invariant/after_name",
+    ),
+    pytest.param(
+        ConstraintRemove(C_LT_5, True),
+        location(
+            label("name", "location0"),
+            label("invariant", "c &lt; 5"),
+            label("exponentialrate", "foo"),
+        ),
+        2,
+        location(label("name", "location0"), label("exponentialrate", "foo")),
+        id="invariant/between_labels",
+    ),
+    pytest.param(
+        ConstraintRemove(cc("5 == c"), True),
+        transition(label("guard", "5 == c")),
+        3,
+        transition(),
+        id="guard/remove_label",
+    ),
+]
+
+# (obj, new_label)
+INSERT_INIT = [(C_GT_15, None)]
+
+# (ci, lines, res, i, pi)
+INSERT_PATCH = [
+    pytest.param(
+        ConstraintInsert(
+            C1_MINUS_C_LE_5,
+            ConstraintLabel("invariant", "", (18, -34), CTX, [C1_MINUS_C_LE_5]),
+        ),
+        location(),
+        location(label("invariant", "c1 - c &lt;= 5")),
+        0,
+        0,
+        id="invariant/new_label",
+    ),
+    pytest.param(
+        ConstraintInsert(C_EQ_3),
+        location(label("invariant", "x - y &lt;= 5")),
+        location(label("invariant", "x - y &lt;= 5 &amp;&amp; c == 3")),
+        1,
+        0,
+        id="invariant/append",
+    ),
+    pytest.param(
+        ConstraintInsert(
+            C_EQ_5, ConstraintLabel("guard", "", (18, -34), CTX, [C_EQ_5])
+        ),
+        transition(),
+        transition(label("guard", "c == 5")),
+        2,
+        0,
+        id="guard/new_label",
+    ),
+    pytest.param(
+        ConstraintInsert(C_EQ_5),
+        transition(label("guard", "clock2 == 5"), label("synchronisation", "foo")),
+        transition(
+            label("guard", "clock2 == 5 &amp;&amp; c == 5"),
+            label("synchronisation", "foo"),
+        ),
+        3,
+        0,
+        id="guard/append_before_sync",
+    ),
+]
+
+# (c, update, old, new)
+UPDATE_INIT = [(C_EQ_3, ConstraintUpdate(C_EQ_3, "11"), "3", "11")]
+
+_update = ConstraintUpdate(cc("c > 10"), "13")
+
+# (cu, exprs, res)
+UPDATE_FIND = [
+    (_update, ("c &gt; 10",), 0),
+    (_update, ("c1 == 10", "c &gt; 10"), 1),
+    (_update, ("c1 &gt; 13",), NOT_FOUND),
+]
+
+# (cu, lines, index, res)
+UPDATE_PATCH = [
+    pytest.param(
+        ConstraintUpdate(C_LT_5, "10"),
+        location(label("invariant", "c &lt; 5 &amp;&amp; y &lt; 5")),
+        1,
+        location(label("invariant", "c &lt; 10 &amp;&amp; y &lt; 5")),
+        id="invariant/first_of_two",
+    ),
+    pytest.param(
+        ConstraintUpdate(cc("c1 < 1"), "2"),
+        location(label("invariant", "c1 &lt; 1")),
+        1,
+        location(label("invariant", "c1 &lt; 2")),
+        id="invariant/threshold_right",
+    ),
+    pytest.param(
+        ConstraintUpdate(cc("1 < c1"), "2"),
+        location(label("invariant", "1 &lt; c1")),
+        1,
+        location(label("invariant", "2 &lt; c1")),
+        id="invariant/threshold_left",
+    ),
+]
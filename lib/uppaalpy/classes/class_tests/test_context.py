@@ -1,8 +1,33 @@
 """Unit tests for Context and MutableContext."""
+import pytest
 
 from uppaalpy.classes.context import Context, MutableContext
 
 
+@pytest.fixture(scope="session")
+def empty_ctx():
+    """Return a Context without any names."""
+    return Context(set(), {}, {})
+
+
+@pytest.fixture(scope="session")
+def foo_clock_ctx():
+    """Return a Context with the clock foo."""
+    return Context({"foo"}, {}, {})
+
+
+@pytest.fixture(scope="session")
+def foo_bar_clock_ctx():
+    """Return a Context with the clocks foo and bar."""
+    return Context({"foo", "bar"}, {}, {})
+
+
+@pytest.fixture(scope="session")
+def foo_const_bar_var_ctx():
+    """Return a Context with the constant foo and the variable bar."""
+    return Context(set(), {"foo": 3}, {"bar": 4})
+
+
 class TestContext:
     """Context tests."""
 
@@ -21,56 +46,55 @@ class TestContext:
         assert c.initial_state["z"] == 11
 
     @staticmethod
-    def test_context_is_clock():
+    @pytest.mark.parametrize(
+        "ctx_name, name, res",
+        [
+            ("empty_ctx", "notclock", False),
+            ("foo_clock_ctx", "foo", True),
+            ("foo_bar_clock_ctx", "foo", True),
+            ("foo_bar_clock_ctx", "bar", True),
+            ("foo_const_bar_var_ctx", "foo", False),
+            ("foo_const_bar_var_ctx", "bar", False),
+        ],
+    )
+    def test_context_is_clock(request, ctx_name, name, res):
         """Test is_clock method."""
-        c = Context(set(), {}, {})
-        assert c.is_clock("notclock") == False
-
-        c = Context(set(["foo"]), {}, {})
-        assert c.is_clock("foo")
-
-        c = Context(set(["foo", "bar"]), {}, {})
-        assert c.is_clock("foo")
-        assert c.is_clock("bar")
-
-        c = Context(set(), {"foo": 3}, {"bar": 4})
-        assert c.is_clock("foo") == False
-        assert c.is_clock("bar") == False
+        assert request.getfixturevalue(ctx_name).is_clock(name) is res
 
     @staticmethod
-    def test_context_is_constant():
+    @pytest.mark.parametrize(
+        "ctx_name, name, res",
+        [("empty_ctx", "notconstant", False), ("foo_const_bar_var_ctx", "foo", True)],
+    )
+    def test_context_is_constant(request, ctx_name, name, res):
         """Test is_constant method."""
-        c = Context(set(), {}, {})
-        assert c.is_constant("notconstant") == False
-
-        c = Context(set([]), {"foo": 4}, {})
-        assert c.is_constant("foo")
+        assert request.getfixturevalue(ctx_name).is_constant(name) is res
 
     @staticmethod
-    def test_context_is_variable():
+    @pytest.mark.parametrize(
+        "ctx_name, name, res",
+        [("empty_ctx", "notvar", False), ("foo_const_bar_var_ctx", "bar", True)],
+    )
+    def test_context_is_variable(request, ctx_name, name, res):
         """Test is_variable method."""
-        c = Context(set(), {}, {})
-        assert c.is_variable("notvar") == False
-
-        c = Context(set([]), {}, {"foo": 4})
-        assert c.is_variable("foo")
+        assert request.getfixturevalue(ctx_name).is_variable(name) is res
 
     @staticmethod
-    def test_context_is_literal():
+    @pytest.mark.parametrize(
+        "ctx_name, name, res",
+        [("empty_ctx", "9", True), ("foo_const_bar_var_ctx", "hello", False)],
+    )
+    def test_context_is_literal(request, ctx_name, name, res):
         """Test is_literal method."""
-        c = Context(set(), {}, {})
-        assert c.is_literal("9")
-
-        c = Context(set([]), {}, {"foo": 4})
-        assert c.is_literal("hello") == False
+        assert request.getfixturevalue(ctx_name).is_literal(name) is res
 
     @staticmethod
-    def test_context_get_val():
+    def test_context_get_val(foo_const_bar_var_ctx):
         """Test get_val method."""
-        c = Context(set(), {"foo": 3}, {"bar": 4})
-        c.get_val("foo") == 3
-        c.get_val("bar") == 4
-        c.get_val("15") == 15
+        c = foo_const_bar_var_ctx
+        assert c.get_val("foo") == 3
+        assert c.get_val("bar") == 4
+        assert c.get_val("15") == 15
 
     @staticmethod
     def test_context_parse_context():
@@ -82,7 +106,6 @@ int a = 11, b;
 clock c1, c2,c3;
             """
         )
-        print(c.clocks, c.constants, c.initial_state, sep="\n")
         assert c.is_constant("x") and c.get_val("x") == 0
         assert c.is_constant("y") and c.get_val("y") == 10
 
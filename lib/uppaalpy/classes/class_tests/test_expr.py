@@ -1,16 +1,16 @@
 """Unit tests for expressions."""
-from pytest_cases.case_parametrizer_new import parametrize_with_cases
+import pytest
 
 from uppaalpy.classes.class_tests.test_expr_cases import (
-    CaseClockConstraintClock,
-    CaseClockResetInit,
-    CaseConstraintHandle,
-    CaseConstraintParse,
-    CaseExprTokenize,
-    CaseUpdateExprJoin,
-    CaseUpdateExprSplit,
-    CaseUpdateHandle,
-    CaseUpdateInit,
+    CLOCK_CONSTRAINT_CLOCK,
+    CLOCK_RESET_INIT,
+    CONSTRAINT_HANDLE,
+    CONSTRAINT_PARSE,
+    EXPR_TOKENIZE,
+    UPDATE_EXPR_JOIN,
+    UPDATE_EXPR_SPLIT,
+    UPDATE_HANDLE,
+    UPDATE_INIT,
 )
 from uppaalpy.classes.expr import (
     ClockConstraintExpression,
@@ -22,7 +22,7 @@ from uppaalpy.classes.expr import (
 
 
 class TestExpr:
-    @parametrize_with_cases("string, res", cases=CaseExprTokenize)
+    @pytest.mark.parametrize("string, res", EXPR_TOKENIZE)
     def test_tokenize(self, string, res):
         r = Expression.tokenize(string)
         assert len(r) == 3
@@ -32,16 +32,16 @@ class TestExpr:
 
 
 class TestUpdateExpr:
-    @parametrize_with_cases("string, ctx", cases=CaseUpdateInit)
+    @pytest.mark.parametrize("string, ctx", UPDATE_INIT)
     def test_init(self, string, ctx):
         UpdateExpression(string, ctx)
 
-    @parametrize_with_cases("string, ctx", cases=CaseUpdateInit)
+    @pytest.mark.parametrize("string, ctx", UPDATE_INIT)
     def test_to_str(self, string, ctx):
         r = UpdateExpression(string, ctx)
         assert string == r.to_string()
 
-    @parametrize_with_cases("string, res", cases=CaseUpdateExprSplit)
+    @pytest.mark.parametrize("string, res", UPDATE_EXPR_SPLIT)
     def test_split(self, string, res):
         r = UpdateExpression.split_into_simple(string)
         for i, subexprstr in enumerate(r):
@@ -49,12 +49,12 @@ class TestUpdateExpr:
             if res is not None:
                 assert subexprstr == res[i]
 
-    @parametrize_with_cases("strings, res", cases=CaseUpdateExprJoin)
+    @pytest.mark.parametrize("strings, res", UPDATE_EXPR_JOIN)
     def test_join_str(self, strings, res):
         r = UpdateExpression.join_strings(strings)
         assert r == res
 
-    @parametrize_with_cases("expr, ctx, res, diff", cases=CaseUpdateHandle)
+    @pytest.mark.parametrize("expr, ctx, res, diff", UPDATE_HANDLE)
     def test_handle_update(self, expr, ctx, res, diff):
         old = ctx.get_val(expr.lhs)
         expr.handle_update(ctx)
@@ -68,7 +68,7 @@ class TestUpdateExpr:
 
 
 class TestClockReset:
-    @parametrize_with_cases("string, ctx", cases=CaseClockResetInit)
+    @pytest.mark.parametrize("string, ctx", CLOCK_RESET_INIT)
     def test_init(self, string, ctx):
         e = ClockResetExpression(string, ctx)
         assert e.clock == e.lhs
@@ -76,24 +76,36 @@ class TestClockReset:
 
 
 class TestConstraintExpr:
-    @parametrize_with_cases(
-        "string, ctx, is_clock_constraint", cases=CaseConstraintParse
-    )
+    @pytest.mark.parametrize("string, ctx, is_clock_constraint", CONSTRAINT_PARSE)
     def test_parse(self, string, ctx, is_clock_constraint):
         expr = ConstraintExpression.parse_expr(string, ctx)
         assert isinstance(expr, ClockConstraintExpression) == is_clock_constraint
 
-    @parametrize_with_cases("string, ctx, res", cases=CaseConstraintHandle)
+    @pytest.mark.parametrize("string, ctx, res", CONSTRAINT_HANDLE)
     def test_handle(self, string, ctx, res):
         expr = ConstraintExpression(string, ctx)
         assert expr.handle_constraint(ctx) == res
 
 
 class TestClockConstraint:
-    @parametrize_with_cases(
-        "string, ctx, res_clock, res_thres", cases=CaseClockConstraintClock
+    @pytest.mark.parametrize(
+        "string, ctx, res_clock, res_thres", CLOCK_CONSTRAINT_CLOCK
     )
     def test_clock_and_thres(self, string, ctx, res_clock, res_thres):
         expr = ClockConstraintExpression(string, ctx)
         assert expr.clocks == res_clock
         assert expr.threshold == res_thres
+
+    @pytest.mark.parametrize(
+        "string, ctx, res_clock, res_thres", CLOCK_CONSTRAINT_CLOCK
+    )
+    def test_to_string(self, string, ctx, res_clock, res_thres):
+        expr = ClockConstraintExpression(string, ctx)
+        operator = expr.operator
+        clocks = " - ".join(res_clock)
+        if string.startswith(res_thres):
+            expected = " ".join((res_thres, expr.op, clocks))
+        else:
+            expected = " ".join((clocks, expr.op, res_thres))
+        assert expr.to_string() == expected == string
+        assert expr.operator == operator
@@ -1,5 +1,7 @@
-from pytest_cases import parametrize
+"""Cases for the unit tests in test_expr.py.
 
+Each list holds the arguments of one parametrized test.
+"""
 from uppaalpy.classes.class_tests.test_context_cases import DataContext
 from uppaalpy.classes.expr import (
     ClockConstraintExpression,
@@ -8,8 +10,10 @@ from uppaalpy.classes.expr import (
     UpdateExpression,
 )
 
+CTX = DataContext.ctx()
 
-class DataClockConstraintExpr(DataContext):
+
+class DataClockConstraintExpr:
     @classmethod
     def exprstr(cls):
         return ["c2 == 3 && 4 < c"] + cls.simple_exprstr()
@@ -20,7 +24,7 @@ class DataClockConstraintExpr(DataContext):
 
     @classmethod
     def expr(cls):
-        return [ClockConstraintExpression(s, cls.ctx()) for s in cls.exprstr()]
+        return [ClockConstraintExpression(s, CTX) for s in cls.exprstr()]
 
 
 class DataConstraintExpr(DataClockConstraintExpr):
@@ -38,10 +42,10 @@ class DataConstraintExpr(DataClockConstraintExpr):
 
     @classmethod
     def expr(cls):
-        return [ConstraintExpression(s, cls.ctx()) for s in cls.exprstr()]
+        return [ConstraintExpression(s, CTX) for s in cls.exprstr()]
 
 
-class DataClockResetExpr(DataContext):
+class DataClockResetExpr:
     @classmethod
     def exprstr(cls):
         return cls.simple_exprstr() + [
@@ -57,7 +61,7 @@ class DataClockResetExpr(DataContext):
 
     @classmethod
     def expr(cls):
-        return [ClockResetExpression(s, cls.ctx()) for s in cls.exprstr()]
+        return [ClockResetExpression(s, CTX) for s in cls.exprstr()]
 
 
 class DataUpdateExpr(DataClockResetExpr):
@@ -86,7 +90,7 @@ class DataUpdateExpr(DataClockResetExpr):
 
     @classmethod
     def expr(cls):
-        return [UpdateExpression(s, cls.ctx()) for s in cls.exprstr()]
+        return [UpdateExpression(s, CTX) for s in cls.exprstr()]
 
 
 class DataExpr:
@@ -99,146 +103,69 @@ class DataExpr:
         return DataUpdateExpr.simple_exprstr() + DataConstraintExpr.exprstr()
 
 
-class CaseExprStr:
-    class C(DataExpr, DataContext):
-        pass
-
-
-class CaseExprTokenize:
-    class C(DataExpr):
-        pass
-
-    @parametrize("simple_str", C.simple_exprstr())
-    def case_no_exception(self, simple_str):
-        return simple_str, None
-
-    def case_01(self):
-        return "x <= 15", ["x", "<=", "15"]
-
-    def case_02(self):
-        return "15 = x", ["15", "=", "x"]
-
-    def case_03(self):
-        return "i += 15", ["i", "+=", "15"]
-
-    def case_04(self):
-        return "clock > 10", ["clock", ">", "10"]
-
-
-class CaseUpdateInit:
-    class C(DataUpdateExpr, DataContext):
-        pass
-
-    @parametrize("string", C.simple_exprstr())
-    def case_no_exception(self, string):
-        return string, self.C.ctx()
-
-
-class CaseUpdateExprSplit:
-    class C(DataUpdateExpr):
-        pass
-
-    @parametrize("complex_str", C.exprstr())
-    def case_no_comma(self, complex_str):
-        return complex_str, None
-
-    def case_01(self):
-        return "x = 10", ["x = 10"]
-
-    def case_02(self):
-        return "i += 10, j = 15", ["i += 10", " j = 15"]
-
-    def case_03(self):
-        return "i = j,j=i", ["i = j", "j=i"]
-
-    def case_04(self):
-        return "i = j ,j=i", ["i = j ", "j=i"]
-
-    def case_05(self):
-        return "i = j , j=i, j = 10", ["i = j ", " j=i", " j = 10"]
-
-
-class CaseUpdateExprJoin:
-    class C(DataUpdateExpr):
-        pass
-
-    def case_01(self):
-        return ["x = 10", "y = 10"], "x = 10, y = 10"
-
-    def case_02(self):
-        return ["x = 10"], "x = 10"
-
-
-class CaseUpdateHandle:
-    class C(DataUpdateExpr, DataContext):
-        pass
-
-    def case_01(self):
-        return (
-            UpdateExpression("i += 10", self.C.ctx()),
-            self.C.ctx().to_MutableContext(),
-            None,
-            10,
-        )
-
-    def case_02(self):
-        return (
-            UpdateExpression("i = 10", self.C.ctx()),
-            self.C.ctx().to_MutableContext(),
-            10,
-            None,
-        )
-
-
-class CaseClockResetInit:
-    class C(DataClockResetExpr, DataContext):
-        pass
-
-    @parametrize("string", C.simple_exprstr())
-    def case_all(self, string):
-        return string, self.C.ctx()
-
-
-class CaseConstraintParse:
-    class C(DataContext):
-        pass
-
-    def case_01(self):
-        return "x == 0", self.C.ctx(), False
-
-    def case_02(self):
-        return "c >= 15", self.C.ctx(), True
-
-
-class CaseConstraintHandle:
-    class C(DataContext):
-        pass
-
-    def case_01(self):
-        return "10 >= x", self.C.ctx(), True
-
-    def case_02(self):
-        return "x == -10", self.C.ctx(), True
-
-    def case_03(self):
-        return "i < j", self.C.ctx(), True
-
-    def case_04(self):
-        return "j < i", self.C.ctx(), False
-
-
-class CaseClockConstraintClock:
-    class C(DataContext):
-        pass
-
-    def case_01(self):
-        return "c1 <= 15", self.C.ctx(), ["c1"], "15"
-
-    def case_02(self):
-        return "15 == c2", self.C.ctx(), ["c2"], "15"
-
-    def case_03(self):
-        return "x > c", self.C.ctx(), ["c"], "x"
-
-    def case_04(self):
-        return "c - c1 < 10", self.C.ctx(), ["c", "c1"], "10"
+# (string, res)
+EXPR_TOKENIZE = [(s, None) for s in DataExpr.simple_exprstr()] + [
+    ("x <= 15", ["x", "<=", "15"]),
+    ("15 = x", ["15", "=", "x"]),
+    ("i += 15", ["i", "+=", "15"]),
+    ("clock > 10", ["clock", ">", "10"]),
+]
+
+# (string, ctx)
+UPDATE_INIT = [(s, CTX) for s in DataUpdateExpr.simple_exprstr()]
+
+# (string, res)
+UPDATE_EXPR_SPLIT = [(s, None) for s in DataUpdateExpr.exprstr()] + [
+    ("x = 10", ["x = 10"]),
+    ("i += 10, j = 15", ["i += 10", " j = 15"]),
+    ("i = j,j=i", ["i = j", "j=i"]),
+    ("i = j ,j=i", ["i = j ", "j=i"]),
+    ("i = j , j=i, j = 10", ["i = j ", " j=i", " j = 10"]),
+]
+
+# (strings, res)
+UPDATE_EXPR_JOIN = [
+    (["x = 10", "y = 10"], "x = 10, y = 10"),
+    (["x = 10"], "x = 10"),
+]
+
+# (expr, ctx, res, diff)
+UPDATE_HANDLE = [
+    (
+        UpdateExpression("i += 10", CTX),
+        CTX.to_MutableContext(),
+        None,
+        10,
+    ),
+    (
+        UpdateExpression("i = 10", CTX),
+        CTX.to_MutableContext(),
+        10,
+        None,
+    ),
+]
+
+# (string, ctx)
+CLOCK_RESET_INIT = [(s, CTX) for s in DataClockResetExpr.simple_exprstr()]
+
+# (string, ctx, is_clock_constraint)
+CONSTRAINT_PARSE = [
+    ("x == 0", CTX, False),
+    ("c >= 15", CTX, True),
+]
+
+# (string, ctx, res)
+CONSTRAINT_HANDLE = [
+    ("10 >= x", CTX, True),
+    ("x == -10", CTX, True),
+    ("i < j", CTX, True),
+    ("j < i", CTX, False),
+]
+
+# (string, ctx, res_clock, res_thres)
+CLOCK_CONSTRAINT_CLOCK = [
+    ("c1 <= 15", CTX, ["c1"], "15"),
+    ("15 == c2", CTX, ["c2"], "15"),
+    ("x > c", CTX, ["c"], "x"),
+    ("c - c1 < 10", CTX, ["c", "c1"], "10"),
+]
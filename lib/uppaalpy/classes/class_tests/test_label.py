@@ -1,27 +1,29 @@
 """Unit tests for Label class."""
 
-from pytest_cases.case_parametrizer_new import parametrize_with_cases
+import pytest
 
 from uppaalpy.classes.class_tests.test_label_cases import (
-    CaseLabelFromElement,
-    CaseLabelInit,
-    CaseLabelToElement,
-    CaseUpdateLabelInit,
-    CaseUpdateResets,
+    LABEL_FROM_ELEMENT,
+    LABEL_INIT,
+    LABEL_TO_ELEMENT,
+    UPDATE_LABEL_INIT,
+    UPDATE_RESETS,
 )
-from uppaalpy.classes.simplethings import Label, UpdateLabel
+from uppaalpy.classes.context import Context
+from uppaalpy.classes.expr import ClockConstraintExpression
+from uppaalpy.classes.simplethings import ConstraintLabel, Label, UpdateLabel
 
 
 class TestLabel:
-    @parametrize_with_cases("kind, val, pos", cases=CaseLabelInit)
+    @pytest.mark.parametrize("kind, val, pos", LABEL_INIT)
     def test_init(self, kind, val, pos):
         Label(kind, val, pos)
 
-    @parametrize_with_cases("element", cases=CaseLabelFromElement)
+    @pytest.mark.parametrize("element", LABEL_FROM_ELEMENT)
     def test_from_element(self, element):
         Label.from_element(element)
 
-    @parametrize_with_cases("element", cases=CaseLabelToElement)
+    @pytest.mark.parametrize("element", LABEL_TO_ELEMENT)
     def test_to_element(self, element):
         e = Label.from_element(element)
         element2 = e.to_element()
@@ -31,8 +33,38 @@ class TestLabel:
         assert element.get("y") == element2.get("y")
 
 
+class TestConstraintLabel:
+    def test_same_value(self):
+        ctx = Context.parse_context("clock x, y;")
+        l1 = ConstraintLabel("guard", "x < 10 && y > 5", None, ctx)
+        l2 = ConstraintLabel("guard", "x < 10 && y > 5", None, ctx)
+
+        for c1, c2 in zip(l1.constraints, l2.constraints):
+            assert c1 is not c2
+            assert c1.to_string() == c2.to_string()
+
+        l1.constraints[0].threshold = "20"
+        assert l2.constraints[0].threshold == "10"
+
+    def test_parse_per_context(self):
+        clock_ctx = Context.parse_context("clock x;")
+        int_ctx = Context.parse_context("int x;")
+        guard = ConstraintLabel("guard", "x < 10", None, clock_ctx)
+        assert isinstance(guard.constraints[0], ClockConstraintExpression)
+        guard = ConstraintLabel("guard", "x < 10", None, int_ctx)
+        assert not isinstance(guard.constraints[0], ClockConstraintExpression)
+
+        mutable_ctx = int_ctx.to_MutableContext()
+        mutable_ctx.clocks.add("y")
+        guard = ConstraintLabel("guard", "y < 10", None, mutable_ctx)
+        assert isinstance(guard.constraints[0], ClockConstraintExpression)
+        mutable_ctx.clocks.remove("y")
+        guard = ConstraintLabel("guard", "y < 10", None, mutable_ctx)
+        assert not isinstance(guard.constraints[0], ClockConstraintExpression)
+
+
 class TestUpdateLabel:
-    @parametrize_with_cases("kind, val, pos, ctx, updates", cases=CaseUpdateLabelInit)
+    @pytest.mark.parametrize("kind, val, pos, ctx, updates", UPDATE_LABEL_INIT)
     def test_init(self, kind, val, pos, ctx, updates):
         l = UpdateLabel(kind, val, pos, ctx, updates)
 
@@ -42,6 +74,6 @@ class TestUpdateLabel:
         if updates is not None:
             assert l.updates == updates
 
-    @parametrize_with_cases("label, res", cases=CaseUpdateResets)
+    @pytest.mark.parametrize("label, res", UPDATE_RESETS)
     def test_resets(self, label, res):
         assert label.get_resets() == res
@@ -1,19 +1,21 @@
+"""Cases for the unit tests in test_label.py.
+
+Each list holds the arguments of one parametrized test.
+"""
 from itertools import product
 
 from lxml import etree as ET
-from pytest_cases import parametrize
 from uppaalpy.classes.class_tests.test_context_cases import DataContext
 
 from uppaalpy.classes.expr import ClockResetExpression, UpdateExpression
 from uppaalpy.classes.simplethings import UpdateLabel
 
-# from uppaalpy.classes.class_tests.test_context_cases import DataContext
+CTX = DataContext.ctx()
 
 
 class CaseUpdateLabel:
     pass
     label_kinds = ["assignment"]
-    # ctx = DataContext.ctx
     label_vals = [
         "c1 = 0",
         "c1 = 0, c2 = 0",
@@ -61,64 +63,31 @@ class DataLabel:
     label_element = [ET.fromstring(s) for s in label_element_str]
 
 
-class CaseLabelInit:
-    class C(DataLabel):
-        pass
-
-    @parametrize("kind, val", zip(C.label_kinds, C.label_vals))
-    def case_no_position(self, kind, val):
-        return (kind, val, None)
-
-    @parametrize("kind, val, pos", zip(C.label_kinds, C.label_vals, C.label_pos))
-    def case_with_position(self, kind, val, pos):
-        return (kind, val, pos)
-
-
-class CaseLabelFromElement:
-    class C(DataLabel):
-        pass
-
-    @parametrize("e", C.label_element)
-    def case_1(self, e):
-        return e
-
-
-class CaseLabelToElement:
-    class C(DataLabel):
-        pass
-
-    @parametrize("e", C.label_element)
-    def case_1(self, e):
-        return e
-
-class CaseUpdateLabelInit:
-    class C(DataLabel, DataContext):
-        pass
-
-    def case_updates_none(self):
-        ctx = self.C.ctx()
-        return "assignment", "i += 15", (0, 1), ctx, None
+# (kind, val, pos)
+LABEL_INIT = [
+    (kind, val, None) for kind, val in zip(DataLabel.label_kinds, DataLabel.label_vals)
+] + list(zip(DataLabel.label_kinds, DataLabel.label_vals, DataLabel.label_pos))
 
-    def case_updates_not_none(self):
-        ctx = self.C.ctx()
-        e = UpdateExpression("i += 15", ctx)
-        return "assignment", "i += 15", (0, 1), ctx, [e]
+# (element)
+LABEL_FROM_ELEMENT = DataLabel.label_element
 
-    def case_updates_multi(self):
-        ctx = self.C.ctx()
-        e1 = UpdateExpression("i += 15", ctx)
-        e2 = ClockResetExpression("c = 0", ctx)
-        return "assignment", "i += 15", (0, 1), ctx, [e1, e2]
+# (element)
+LABEL_TO_ELEMENT = DataLabel.label_element
 
-class CaseUpdateResets:
-    class C(DataLabel, DataContext):
-        pass
 
-    def case_01(self):
-        return UpdateLabel("assignment", "i += 10", (0, 0), self.C.ctx()), []
+_increment = UpdateExpression("i += 15", CTX)
+_reset = ClockResetExpression("c = 0", CTX)
 
-    def case_02(self):
-        return UpdateLabel("assignment", "c = 0", (0, 0), self.C.ctx()), ["c"]
+# (kind, val, pos, ctx, updates)
+UPDATE_LABEL_INIT = [
+    ("assignment", "i += 15", (0, 1), CTX, None),
+    ("assignment", "i += 15", (0, 1), CTX, [_increment]),
+    ("assignment", "i += 15", (0, 1), CTX, [_increment, _reset]),
+]
 
-    def case_03(self):
-        return UpdateLabel("assignment", "c = 0, c1 = 0, i += 10", (0, 0), self.C.ctx()), ["c", "c1"]
+# (label, res)
+UPDATE_RESETS = [
+    (UpdateLabel("assignment", "i += 10", (0, 0), CTX), []),
+    (UpdateLabel("assignment", "c = 0", (0, 0), CTX), ["c"]),
+    (UpdateLabel("assignment", "c = 0, c1 = 0, i += 10", (0, 0), CTX), ["c", "c1"]),
+]
@@ -2,7 +2,6 @@
 from typing import cast
 import lxml.etree as ET
 import pytest
-from uppaalpy.classes.class_tests.test_context_cases import DataContext
 from uppaalpy.classes.expr import ClockConstraintExpression
 
 from uppaalpy.classes.nodes import BranchPoint, Location, Node
@@ -11,10 +10,7 @@ from uppaalpy.classes.simplethings import ConstraintLabel, Name
 
 class TestNode:
     """Node tests."""
-    class C(DataContext):
-        pass
-
-    def test_generate_dict(self):
+    def test_generate_dict(self, ctx):
         """Test initialization data generated from an Element."""
         n1 = Node.generate_dict(
             ET.fromstring(
@@ -23,7 +19,7 @@ class TestNode:
             <name x="208" y="392">Stop</name>
         </location>
             """
-            ), self.C.ctx()
+            ), ctx
         )
         assert n1["id"] == "id1"
         assert n1["pos"] == (192, 384)
@@ -38,7 +34,7 @@ class TestNode:
             <label kind="invariant" x="32" y="264">x&lt;=20</label>
         </location>
             """
-            ), self.C.ctx()
+            ), ctx
         )
         assert n2["id"] == "id3"
         assert n2["pos"] == (96, 256)
@@ -57,7 +53,7 @@ class TestNode:
                         <label kind="exponentialrate" x="134" y="-73">3</label>
                 </location>
             """
-            ), self.C.ctx()
+            ), ctx
         )
         assert n3["id"] == "id5"
         assert n3["pos"] == (144, -88)
@@ -78,7 +74,7 @@ class TestNode:
                         <label kind="testcodeEnter">expect_off();</label>
                 </location>
             """
-            ), self.C.ctx()
+            ), ctx
         )
         assert n4["id"] == "id2"
         assert n4["pos"] == (8, -17)
@@ -96,7 +92,7 @@ class TestNode:
                         <committed/>
                 </location>
             """
-            ), self.C.ctx()
+            ), ctx
         )
         assert n5["id"] == "id9"
         assert n5["pos"] == (88, 336)
@@ -105,9 +101,6 @@ class TestNode:
 
 class TestBranchPoint:
     """Unit tests for branchpoints."""
-    class C(DataContext):
-        pass
-
     @staticmethod
     def test_branchpoint_init():
         """Test the init method."""
@@ -124,31 +117,31 @@ class TestBranchPoint:
         with pytest.raises(KeyError):
             assert BranchPoint(id=13)
 
-    def test_branchpoint_from_element(self):
+    def test_branchpoint_from_element(self, ctx):
         """Test the from_element method."""
         xml1 = ET.fromstring('<branchpoint id="id4" x="-25" y="-25"></branchpoint>')
-        bp1 = BranchPoint.from_element(xml1, self.C.ctx())
+        bp1 = BranchPoint.from_element(xml1, ctx)
 
         assert bp1.id == "id4"
         assert bp1.pos == (-25, -25)
 
         xml2 = ET.fromstring('<branchpoint id="id7" x="48" y="-48"></branchpoint>')
-        bp2 = BranchPoint.from_element(xml2, self.C.ctx())
+        bp2 = BranchPoint.from_element(xml2, ctx)
 
         assert bp2.id == "id7"
         assert bp2.pos == (48, -48)
 
-    def test_branchpoint_to_element(self):
+    def test_branchpoint_to_element(self, ctx):
         """Test the to_element method."""
         xml1 = ET.fromstring('<branchpoint id="id4" x="-25" y="-25"></branchpoint>')
-        e1 = BranchPoint.from_element(xml1, self.C.ctx()).to_element()
+        e1 = BranchPoint.from_element(xml1, ctx).to_element()
 
         assert e1.get("id") == "id4"
         assert e1.get("x") == "-25"
         assert e1.get("y") == "-25"
 
         xml2 = ET.fromstring('<branchpoint id="id7" x="48" y="-48"></branchpoint>')
-        e2 = BranchPoint.from_element(xml2, self.C.ctx()).to_element()
+        e2 = BranchPoint.from_element(xml2, ctx).to_element()
 
         assert e2.get("id") == "id7"
         assert e2.get("x") == "48"
@@ -158,10 +151,7 @@ class TestBranchPoint:
 class TestLocation:
     """Tests for Location class."""
 
-    class C(DataContext):
-        pass
-
-    def test_location_init(self):
+    def test_location_init(self, ctx):
         """Test the init method."""
         l1 = Location(id="id1", pos=(1, 3))
         assert l1.id == "id1"
@@ -178,7 +168,7 @@ class TestLocation:
             id="id1",
             pos=(1, 3),
             name=Name("loc1", (4, 8)),
-            invariant=ConstraintLabel("invariant", "x <= 13", (14, 28), self.C.ctx()),
+            invariant=ConstraintLabel("invariant", "x <= 13", (14, 28), ctx),
         )
         assert l3.id == "id1"
         assert l3.pos == (1, 3)
@@ -193,7 +183,7 @@ class TestLocation:
         with pytest.raises(KeyError):
             assert Location(pos=(1, 3))
 
-    def test_location_from_element(self):
+    def test_location_from_element(self, ctx):
         """Test the from_element method."""
         l1 = Location.from_element(
             ET.fromstring(
@@ -202,7 +192,7 @@ class TestLocation:
             <name x="208" y="392">Stop</name>
         </location>
             """
-            ), self.C.ctx()
+            ), ctx
         )
 
         assert l1.id == "id1"
@@ -221,7 +211,7 @@ class TestLocation:
             <committed/>
         </location>
             """
-            ), self.C.ctx()
+            ), ctx
         )
 
         assert l2.id == "id3"
@@ -231,7 +221,7 @@ class TestLocation:
         assert l2.invariant is not None
         assert l2.testcodeEnter is not None
 
-    def test_location_to_element(self):
+    def test_location_to_element(self, ctx):
         """Test the to_element method."""
         e1 = Location.from_element(
             ET.fromstring(
@@ -240,7 +230,7 @@ class TestLocation:
             <name x="208" y="392">Stop</name>
         </location>
             """
-            ), self.C.ctx()
+            ), ctx
         ).to_element()
 
         assert e1.get("id") == "id1"
@@ -258,7 +248,7 @@ class TestLocation:
             <committed/>
         </location>
             """
-            ), self.C.ctx()
+            ), ctx
         ).to_element()
 
         assert e2.get("id") == "id3"
@@ -271,7 +261,7 @@ class TestLocation:
         assert e2.find("committed") in e2
         assert e2.find("urgent") not in e2
 
-    def test_location_get_constrasints(self):
+    def test_location_get_constrasints(self, ctx):
         """Test Location.get_constraints()."""
         l1 = Location.from_element(
             ET.fromstring(
@@ -280,7 +270,7 @@ class TestLocation:
             <name x="208" y="392">Stop</name>
         </location>
             """
-            ), self.C.ctx()
+            ), ctx
         )
 
         assert l1.get_constraints() == []
@@ -296,7 +286,7 @@ class TestLocation:
             <committed/>
         </location>
             """
-            ), self.C.ctx()
+            ), ctx
         )
 
         cs = l2.get_constraints()
@@ -1,63 +1,56 @@
 """Tests for NTA class."""
 
-#TODO: reintroduce random changers
+import filecmp
+import random
+import re
+from io import BytesIO
 
+import pytest
+from lxml import etree as ET
+
+from uppaalpy.classes.class_tests.random_changers import random_scenario
 from uppaalpy.classes.context import Context
 from uppaalpy.classes.nta import NTA
 from uppaalpy.classes.simplethings import Declaration, SystemDeclaration
 
 testcase_dir = "lib/uppaalpy/classes/class_tests/"
+NTA_FILES = ["small_nta.xml", "big_nta.xml"]
+# Files with global and with template-local clocks for the random changers.
+RANDOM_NTA_FILES = [
+    "constraint_cache_xml_files/test01.xml",
+    "nta_xml_files/test3.xml",
+    "nta_xml_files/small_nta.xml",
+    "nta_xml_files/big_nta.xml",
+]
 
 
-def _dec_check(l1, l2):
-    def sub(l):
-        string = (
-            l.replace("UTF-8", "utf-8")
-            .replace("'", '"')
-            .replace("<formula></formula>", "<formula/>")
-            .replace("<comment></comment>", "<comment/>")
-            # operators
-            .replace(" &lt;", "&lt;")
-            .replace(" &gt;", "&gt;")
-            .replace(" &amp;", "&amp;")
-            .replace("&lt; ", "&lt;")
-            .replace("&gt; ", "&gt;")
-            .replace("&amp; ", "&amp;")
-            .replace("= ", "=")
-            .replace(" =", "=")
-            .replace(" -", "-")
-            .replace("- ", "-")
-        )
-        return string[:-1] if string[-1] == "\n" else string
+# An operator with the spaces around it.
+_OPERATOR = re.compile(r" ?([<>&=-]) ?")
 
-    def compare_constraints(l1, l2):
-        start1 = l1.index(">") + 1  # '>' in ...y="..">
-        end1 = l1.index("<", start1)  # '<' in </label>
-        c1 = sorted(l1[start1:end1].split("&amp;&amp;"))
 
-        start2 = l2.index(">") + 1  # '>' in ...y="..">
-        end2 = l2.index("<", start2)  # '<' in </label>
-        c2 = sorted(l2[start2:end2].split("&amp;&amp;"))
+def _canonical(path):
+    """Return the C14N form of an xml file, up to formatting of the labels.
 
-        if len(c1) != len(c2):
-            return False
+    Spaces around operators are dropped from the texts of all elements, and
+    the constraints of guards and invariants are sorted.
+    """
+    tree = ET.parse(path, ET.XMLParser(remove_blank_text=True))
+    for elem in tree.iter():
+        if elem.text:
+            text = _OPERATOR.sub(r"\1", elem.text)
+            if elem.tag == "label" and elem.get("kind") in ("guard", "invariant"):
+                text = "&&".join(sorted(text.split("&&")))
+            elem.text = text
+    return ET.tostring(tree, method="c14n")
 
-        for i in range(len(c1)):
-            if c1[i] != c2[i]:
-                print("{} and {} are not equal.".format(c1[i], c2[i]))
-                return False
-        return True
 
-    str1, str2 = l1.strip(), l2.strip()
-    if (
-        str1.startswith('<label kind="guard"')
-        and str2.startswith('<label kind="guard"')
-        or str1.startswith('<label kind="invariant"')
-        and str2.startswith('<label kind="invariant"')
-    ):
-        return compare_constraints(sub(l1), sub(l2))
+def _assert_files_match(path1, path2):
+    """Assert that two xml files are the same, up to _canonical.
 
-    return sub(l1) == sub(l2)
+    Identical files are accepted without parsing them.
+    """
+    if not filecmp.cmp(path1, path2, shallow=False):
+        assert _canonical(path1) == _canonical(path2)
 
 
 class TestNTA:
@@ -78,12 +71,13 @@ class TestNTA:
         assert nta.templates == []
         assert nta.queries == []
         assert nta._associated_file == ""
+        assert nta._flushed_lines is None
         assert nta._doctype == ""
 
     @staticmethod
-    def test_nta_from_xml():
+    def test_nta_from_xml(shared_nta):
         """Test NTA.from_xml and NTA.from_element."""
-        nta = NTA.from_xml(testcase_dir + "nta_xml_files/small_nta.xml")
+        nta = shared_nta(testcase_dir + "nta_xml_files/small_nta.xml")
         assert len(nta.templates) == 2
         assert nta.declaration.text == "// Place global declarations here."
         assert (
@@ -92,301 +86,181 @@ class TestNTA:
         )
         assert len(nta.queries) == 1
 
-        nta = NTA.from_xml(testcase_dir + "nta_xml_files/big_nta.xml")
+        nta = shared_nta(testcase_dir + "nta_xml_files/big_nta.xml")
         assert len(nta.templates) == 4
         assert nta.declaration.text == "// Place global declarations here.\nchan c1;"
         assert len(nta.queries) == 1
 
     @staticmethod
-    def test_nta_to_file():
+    @pytest.mark.parametrize("fname", NTA_FILES)
+    def test_nta_to_file(shared_nta, tmp_path, fname):
         """Test NTA.to_file."""
+        out = str(tmp_path / "out.xml")
+        path = testcase_dir + "nta_xml_files/" + fname
+        shared_nta(path).to_file(out)
+
+        _assert_files_match(path, out)
+
+    @staticmethod
+    def test_nta_to_file_not_pretty(shared_nta, tmp_path):
+        """Test NTA.to_file with pretty=False."""
+        out = str(tmp_path / "out.xml")
         path = testcase_dir + "nta_xml_files/small_nta.xml"
-        nta = NTA.from_xml(path)
-        nta.to_file("/tmp/out.xml")
+        nta = shared_nta(path)
+        nta.to_file(out, pretty=False)
+
+        with open(out) as outf:
+            outlines = outf.readlines()
+
+        assert not any(line.startswith("\t") for line in outlines)
+
+        nta2 = NTA.from_xml(out)
+        assert len(nta2.templates) == len(nta.templates)
+        assert nta2.system.text == nta.system.text
 
-        with open(path) as inf, open("/tmp/out.xml") as outf:
-            inlines, outlines = inf.readlines(), outf.readlines()
+    @staticmethod
+    def test_nta_to_file_declaration(shared_nta, tmp_path):
+        """Test that NTA.to_file writes the declaration of ElementTree.write."""
+        out = str(tmp_path / "out.xml")
+        path = testcase_dir + "nta_xml_files/small_nta.xml"
+        shared_nta(path).to_file(out)
+
+        with open(out, "rb") as outf:
+            first = outf.readline()
 
-        for i in range(len(inlines)):
-            assert _dec_check(inlines[i], outlines[i])
+        assert first == b"<?xml version='1.0' encoding='UTF-8'?>\n"
 
+    @staticmethod
+    def test_nta_to_bytes(shared_nta, tmp_path):
+        """Test that NTA.to_bytes returns what NTA.to_file writes."""
+        out = str(tmp_path / "out.xml")
         path = testcase_dir + "nta_xml_files/big_nta.xml"
+        nta = shared_nta(path)
+
+        for pretty in (True, False):
+            nta.to_file(out, pretty=pretty)
+            with open(out, "rb") as outf:
+                assert nta.to_bytes(pretty=pretty) == outf.read()
+
+    @staticmethod
+    def test_nta_to_file_object(tmp_path):
+        """Test NTA.to_file with a reused binary file object."""
+        out = str(tmp_path / "out.xml")
+        path = testcase_dir + "constraint_cache_xml_files/test01.xml"
         nta = NTA.from_xml(path)
-        nta.to_file("/tmp/out.xml")
 
-        with open(path) as inf, open("/tmp/out.xml") as outf:
-            inlines, outlines = inf.readlines(), outf.readlines()
+        with open(out, "wb") as outf:
+            for _ in range(2):
+                outf.seek(0)
+                outf.truncate()
+                nta.to_file(outf)
+            assert not outf.closed
 
-        for i in range(len(inlines)):
-            assert _dec_check(inlines[i], outlines[i])
+        with open(out, "rb") as outf:
+            assert outf.read() == nta.to_bytes()
+
+        transition = nta.templates[1].graph._transitions[0]
+        nta.change_clock_constraint(
+            transition,
+            "update",
+            transition.guard.constraints[0],
+            threshold_function=lambda _: "15",
+        )
+        with open(out, "wb") as outf:
+            nta.to_file(outf)
+
+        with open(out, "rb") as outf:
+            assert outf.read() == nta.to_bytes()
 
     @staticmethod
-    def test_nta_flush_changes_no_changes():
-        """Test NTA.flush_constraint_changes() with no changes."""
-        path = testcase_dir + "nta_xml_files/small_nta.xml"
+    def test_nta_to_file_keeps_other_changes(tmp_path):
+        """Test that NTA.to_file writes all changes along with constraint updates."""
+        out = str(tmp_path / "out.xml")
+        path = testcase_dir + "constraint_cache_xml_files/test01.xml"
         nta = NTA.from_xml(path)
-        nta.flush_constraint_changes("/tmp/out.xml")
+        transition = nta.templates[1].graph._transitions[0]
+        nta.change_clock_constraint(
+            transition,
+            "update",
+            transition.guard.constraints[0],
+            threshold_function=lambda _: "15",
+        )
+        nta.system.text += "\n// changed"
+        nta.to_file(out)
 
-        with open(path) as inf, open("/tmp/out.xml") as outf:
-            inlines, outlines = inf.readlines(), outf.readlines()
+        with open(out, "rb") as outf:
+            assert outf.read() == nta.to_bytes()
 
-        for i in range(len(inlines)):
-            assert _dec_check(inlines[i], outlines[i])
+        nta2 = NTA.from_xml(out)
+        assert nta2.system.text.endswith("// changed")
+        guard = nta2.templates[1].graph._transitions[0].guard
+        assert guard.constraints[0].threshold == "15"
 
-        path = testcase_dir + "nta_xml_files/big_nta.xml"
+    @staticmethod
+    @pytest.mark.parametrize("fname", NTA_FILES)
+    def test_nta_flush_changes_no_changes(shared_nta, fname):
+        """Test that NTA.flush_constraint_changes() with no changes copies the file."""
+        path = testcase_dir + "nta_xml_files/" + fname
+        output = BytesIO()
+        shared_nta(path).flush_constraint_changes(output)
+
+        with open(path) as inf:  # Line breaks are normalized, as in the NTA.
+            assert output.getvalue() == inf.read().encode("utf-8")
+
+    @staticmethod
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("fname", RANDOM_NTA_FILES)
+    def test_nta_flush_changes_random(tmp_path, fname, seed):
+        """Test that random changes are flushed as NTA.to_file writes them."""
+        random.seed(seed)
+        nta = random_scenario(testcase_dir + fname, 3, 2, 3)
+        flushed = str(tmp_path / "flushed.xml")
+        written = str(tmp_path / "written.xml")
+        nta.flush_constraint_changes(flushed)
+        nta.to_file(written)
+        _assert_files_match(flushed, written)
+
+    @staticmethod
+    def test_nta_flush_changes_reuses_source_lines(tmp_path):
+        """Test that flush_constraint_changes reads the source file once."""
+        out = str(tmp_path / "out.xml")
+        path = testcase_dir + "constraint_cache_xml_files/test01.xml"
         nta = NTA.from_xml(path)
-        nta.flush_constraint_changes("/tmp/out.xml")
-
-        with open(path) as inf, open("/tmp/out.xml") as outf:
-            inlines, outlines = inf.readlines(), outf.readlines()
-
-        for i in range(len(inlines)):
-            assert _dec_check(inlines[i], outlines[i])
-
-#     @staticmethod
-#     def test_nta_flush_changes1():
-#         """Test NTA.flush_constraint_changes() with no changes."""
-#         path = testcase_dir + "nta_xml_files/small_nta.xml"
-#         out1 = "/tmp/out1.xml"
-#         out2 = "/tmp/out2.xml"
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 0, 0, 10)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 0, 4, 0)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 4, 0, 0)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 2, 2, 2)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 10, 2, 10)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#     @staticmethod
-#     def test_nta_flush_changes2():
-#         """Test NTA.flush_constraint_changes() with no changes."""
-#         path = testcase_dir + "nta_xml_files/big_nta.xml"
-#         out1 = "/tmp/out3.xml"
-#         out2 = "/tmp/out4.xml"
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 0, 0, 10)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 0, 2, 0)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 2, 0, 0)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 2, 2, 2)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 10, 10, 10)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#     @staticmethod
-#     def test_nta_flush_changes3():
-#         """Test NTA.flush_constraint_changes() with no changes."""
-#         path = testcase_dir + "nta_xml_files/test3.xml"
-#         out1 = "/tmp/out5.xml"
-#         out2 = "/tmp/out6.xml"
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 0, 0, 10)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 2, 1, 0)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 2, 0, 0)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 2, 0, 2)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(3):
-#             nta = random_scenario(path, 20, 0, 10)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#     @staticmethod
-#     def test_nta_flush_changes4():
-#         """Test NTA.flush_constraint_changes() with no changes."""
-#         path = testcase_dir + "nta_xml_files/test4.xml"
-#         out1 = "/tmp/out7.xml"
-#         out2 = "/tmp/out8.xml"
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 0, 0, 10)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 3, 1, 0)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 2, 0, 0)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 2, 2, 2)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
-# 
-#         for _ in range(10):
-#             nta = random_scenario(path, 10, 0, 10)
-#             nta.flush_constraint_changes(out1)
-#             nta.to_file(out2)
-# 
-#             with open(out1) as flush, open(out2) as write:
-#                 inlines, outlines = flush.readlines(), write.readlines()
-# 
-#             for i in range(len(inlines)):
-#                 assert _dec_check(inlines[i], outlines[i])
+        with open(path) as inf:
+            source_lines = inf.readlines()
+        nta.flush_constraint_changes(out)
+        flushed_lines = nta._flushed_lines
+
+        transition = nta.templates[1].graph._transitions[0]
+        nta.change_clock_constraint(
+            transition,
+            "update",
+            transition.guard.constraints[0],
+            threshold_function=lambda _: "15",
+        )
+        nta.flush_constraint_changes(out)
+        with open(out) as outf:
+            first = outf.readlines()
+
+        nta.flush_constraint_changes(out)
+        with open(out) as outf:
+            second = outf.readlines()
+
+        assert nta._flushed_lines is flushed_lines
+        assert first == second
+        assert first[56] == source_lines[56].replace("10", "15")
+
+        nta.change_clock_constraint(
+            transition,
+            "update",
+            transition.guard.constraints[0],
+            threshold_function=lambda _: "20",
+        )
+        nta.flush_constraint_changes(out)
+        with open(out) as outf:
+            third = outf.readlines()
+
+        lines = source_lines[:]
+        nta.patch_cache.apply_patches(lines)
+        assert third == lines
+        assert third[56] == source_lines[56].replace("10", "20")
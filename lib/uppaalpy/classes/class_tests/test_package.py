@@ -0,0 +1,40 @@
+"""Tests for the lazy attributes of the uppaalpy packages."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+import uppaalpy
+import uppaalpy.classes
+
+LIB_DIR = os.path.dirname(os.path.dirname(uppaalpy.__file__))
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import uppaalpy; uppaalpy.NTA",
+        "import uppaalpy; uppaalpy.path_analysis.path_exists",
+        "import uppaalpy; uppaalpy.classes.nta.NTA",
+        "import uppaalpy.classes; uppaalpy.classes.nta.NTA",
+    ],
+)
+def test_attribute_access(code):
+    """Test attribute access in a new interpreter, where nothing is imported yet."""
+    env = dict(os.environ, PYTHONPATH=LIB_DIR)
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+def test_missing_attribute():
+    """Test that unknown names still raise AttributeError."""
+    with pytest.raises(AttributeError):
+        uppaalpy.no_such_name
+    with pytest.raises(AttributeError):
+        uppaalpy.classes.no_such_module
+
+
+def test_dir():
+    """Test that the lazy attributes are listed by dir()."""
+    assert {"NTA", "classes", "path_analysis"} <= set(dir(uppaalpy))
+    assert {"nta", "expr"} <= set(dir(uppaalpy.classes))
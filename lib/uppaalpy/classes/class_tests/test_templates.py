@@ -1,23 +1,18 @@
 """Unit tests for Templates and TAGraphs."""
-import lxml.etree as ET
-from uppaalpy.classes.class_tests.test_context_cases import DataContext
+from copy import copy
+
 from uppaalpy.classes.nodes import Location
 from uppaalpy.classes.simplethings import ConstraintLabel, Name
 from uppaalpy.classes.tagraph import TAGraph
 from uppaalpy.classes.templates import Template
 from uppaalpy.classes.transitions import Transition
 
-from .helpers import testcase_dir
-
 
 class TestTemplate:
     """Template tests."""
-    class C(DataContext):
-        pass
-
-    def test_template_init(self):
+    def test_template_init(self, ctx):
         """Test default values set by Template()."""
-        template = Template(self.C.ctx())
+        template = Template(ctx)
         assert template.name.name == ""
         assert template.name.pos == (0, 0)
         assert template.parameter.tag == "parameter"
@@ -25,75 +20,93 @@ class TestTemplate:
         assert template.declaration.tag == "declaration"
         assert template.declaration.text == ""
 
-    def test_template_from_element(self):
+    def test_template_from_element(self, ctx, template_root):
         """Test Template.from_element()."""
-        t = Template.from_element(
-            ET.parse(testcase_dir + "template_xml_files/test1.xml").getroot(),
-            self.C.ctx()
-        )
+        t = Template.from_element(template_root(1), ctx)
         assert t.name.name == "Test1"
         assert t.parameter == None
         assert t.declaration is not None
 
-        t = Template.from_element(
-            ET.parse(testcase_dir + "template_xml_files/test2.xml").getroot(),
-            self.C.ctx()
-        )
+        t = Template.from_element(template_root(2), ctx)
         assert t.name.name == "Test2"
         assert t.parameter == None
         assert t.declaration is not None
 
-        t = Template.from_element(
-            ET.parse(testcase_dir + "template_xml_files/test3.xml").getroot(),
-            self.C.ctx()
-        )
+        t = Template.from_element(template_root(3), ctx)
         assert t.name.name == "P"
         assert t.parameter.text == "const id_t pid"
         assert t.declaration.text == "clock x;\nconst int k = 2;"
 
-        t = Template.from_element(
-            ET.parse(testcase_dir + "template_xml_files/test4.xml").getroot(),
-            self.C.ctx()
-        )
+        t = Template.from_element(template_root(4), ctx)
         assert t.name.name == "Train"
         assert t.parameter.text == "const id_t id"
         assert t.declaration.text == "clock x;"
 
-    def test_template_to_element(self):
+    def test_template_to_element(self, ctx, template_root):
         """Test Template.to_element()."""
-        t = Template.from_element(
-            ET.parse(testcase_dir + "template_xml_files/test1.xml").getroot(), self.C.ctx()
-        ).to_element()
+        t = Template.from_element(template_root(1), ctx).to_element()
         assert t.find("name").text == "Test1"
         assert t.find("parameter") == None
 
-        t = Template.from_element(
-            ET.parse(testcase_dir + "template_xml_files/test2.xml").getroot(), self.C.ctx()
-        ).to_element()
+        t = Template.from_element(template_root(2), ctx).to_element()
         assert t.find("name").text == "Test2"
         assert t.find("parameter") == None
 
-        t = Template.from_element(
-            ET.parse(testcase_dir + "template_xml_files/test3.xml").getroot(), self.C.ctx()
-        ).to_element()
+        t = Template.from_element(template_root(3), ctx).to_element()
         assert t.find("name").text == "P"
         assert t.find("parameter").text == "const id_t pid"
         assert t.find("declaration").text == "clock x;\nconst int k = 2;"
 
-        t = Template.from_element(
-            ET.parse(testcase_dir + "template_xml_files/test4.xml").getroot(), self.C.ctx()
-        ).to_element()
+        t = Template.from_element(template_root(4), ctx).to_element()
         assert t.find("name").text == "Train"
         assert t.find("parameter").text == "const id_t id"
         assert t.find("declaration").text == "clock x;"
 
+    def test_template_from_header(self, ctx, template_root):
+        """Test Template.from_header() and Template.read_graph_element()."""
+        et = template_root(4)
+        t = Template.from_header(et, ctx)
+        assert t.name.name == "Train"
+        assert t.declaration.text == "clock x;"
+        assert len(t.graph.nodes) == 0
+
+        for child in et.iterchildren("location", "branchpoint", "init", "transition"):
+            t.read_graph_element(child)
+
+        expected = Template.from_element(et, ctx)
+        assert t.graph.initial_location == expected.graph.initial_location
+        assert len(t.graph.nodes) == len(expected.graph.nodes)
+        assert len(t.graph._transitions) == len(expected.graph._transitions)
+
+    def test_template_to_element_after_change(self, ctx, template_root):
+        """Test that Template.to_element() reflects direct attribute changes."""
+        t = Template.from_element(template_root(1), ctx)
+        t.to_element()
+
+        loc = next(n for n in t.graph.get_nodes() if n.name is not None)
+        loc.name.name = "renamed"
+        loc.pos = (1, 2)
+        inv = next(
+            n for n in t.graph.get_nodes() if n.invariant and n.invariant.value == "c1 > 7"
+        )
+        inv.invariant.constraints[0].threshold = "8"
+        inv.invariant.constraints.append(copy(inv.invariant.constraints[0]))
+        t.declaration.text = "// changed"
+        t.graph.add_transition(Transition(source="id0", target="id1"))
+
+        element = t.to_element()
+        node = element.find("location[@id='%s']" % loc.id)
+        assert node.find("name").text == "renamed"
+        assert (node.get("x"), node.get("y")) == ("1", "2")
+        assert element.find("declaration").text == "// changed"
+        label = element.find("location[@id='%s']/label" % inv.id)
+        assert label.text == " && ".join(["c1 > 8"] * 2)
+        assert len(element.findall("transition")) == len(t.graph._transitions)
+
 
 class TestTAGraph:
     """Unit tests for TAGraphs."""
 
-    class C(DataContext):
-        pass
-
     @staticmethod
     def test_tagraph_init():
         """Test initial values set by TAGraph()."""
@@ -104,43 +117,43 @@ class TestTAGraph:
         assert graph._named_locations == {}
         assert graph._transitions == []
 
-    def test_tagraph_add_location(self):
+    def test_tagraph_add_location(self, ctx):
         """Test adding a location to the graph."""
         graph = TAGraph(None)
         loc = Location(
             id="id0",
             pos=(0, 0),
             name=Name("loc0", (0, 0)),
-            invariant=ConstraintLabel("invariant", "x <= 3", (0, 0), self.C.ctx()),
+            invariant=ConstraintLabel("invariant", "x <= 3", (0, 0), ctx),
         )
         graph.add_location(loc)
         assert graph._named_locations["loc0"] is not None
-        assert graph.nodes(data="obj")[("", "id0")] == loc
+        assert graph.nodes[("", "id0")]["obj"] == loc
 
         loc2 = Location(
             id="id1",
             pos=(1, 1),
-            invariant=ConstraintLabel("invariant", "x <= 4", (1, 1), self.C.ctx()),
+            invariant=ConstraintLabel("invariant", "x <= 4", (1, 1), ctx),
         )
         graph.add_location(loc2)
         assert len(graph._named_locations.keys()) == 1
-        assert graph.nodes(data="obj")[("", "id1")] == loc2
+        assert graph.nodes[("", "id1")]["obj"] == loc2
 
-    def test_tagraph_add_transition(self):
+    def test_tagraph_add_transition(self, ctx):
         """Test adding a transition to the graph."""
         graph = TAGraph(None)
         loc = Location(
             id="id0",
             pos=(0, 0),
             name=Name("loc0", (0, 0)),
-            invariant=ConstraintLabel("invariant", "x <= 3", (0, 0), self.C.ctx()),
+            invariant=ConstraintLabel("invariant", "x <= 3", (0, 0), ctx),
         )
         graph.add_location(loc)
 
         loc2 = Location(
             id="id1",
             pos=(1, 1),
-            invariant=ConstraintLabel("invariant", "x <= 4", (1, 1), self.C.ctx()),
+            invariant=ConstraintLabel("invariant", "x <= 4", (1, 1), ctx),
         )
         graph.add_location(loc2)
 
@@ -150,11 +163,9 @@ class TestTAGraph:
         assert graph._transitions[0] == trans
         assert graph[("", "id0")][("", "id1")][0]["obj"] == trans
 
-    def test_tagraph_init_with_template(self):
+    def test_tagraph_init_with_template(self, ctx, template_root):
         """Test TAGraph initialization."""
-        t = Template.from_element(
-            ET.parse(testcase_dir + "template_xml_files/test1.xml").getroot(), self.C.ctx()
-        )
+        t = Template.from_element(template_root(1), ctx)
         g = t.graph
         assert g.template == t
         assert g.template_name == t.name.name
@@ -174,21 +185,21 @@ class TestTAGraph:
         assert g._transitions[2].target == "id0"
         assert g._transitions[3].target == "id1"
 
-    def test_tagraph_get_nodes(self):
+    def test_tagraph_get_nodes(self, ctx):
         """Test TAGraph.get_nodes()."""
         graph = TAGraph(None)
         loc = Location(
             id="id0",
             pos=(0, 0),
             name=Name("loc0", (0, 0)),
-            invariant=ConstraintLabel("invariant", "x <= 3", (0, 0), self.C.ctx()),
+            invariant=ConstraintLabel("invariant", "x <= 3", (0, 0), ctx),
         )
         graph.add_location(loc)
 
         loc2 = Location(
             id="id1",
             pos=(1, 1),
-            invariant=ConstraintLabel("invariant", "x <= 4", (1, 1), self.C.ctx()),
+            invariant=ConstraintLabel("invariant", "x <= 4", (1, 1), ctx),
         )
         graph.add_location(loc2)
 
@@ -1,7 +1,6 @@
 """Unit tests for Locations and BranchPoints."""
 import lxml.etree as ET
 import pytest
-from uppaalpy.classes.class_tests.test_context_cases import DataContext
 
 from uppaalpy.classes.simplethings import ConstraintLabel
 from uppaalpy.classes.transitions import Nail, Transition
@@ -10,10 +9,7 @@ from uppaalpy.classes.transitions import Nail, Transition
 class TestTransition:
     """Transition tests."""
 
-    class C(DataContext):
-        pass
-
-    def test_transition_init(self):
+    def test_transition_init(self, ctx):
         """Test Tranisiton()."""
         t1 = Transition(source="id1", target="id1")
         assert t1.source == "id1"
@@ -25,7 +21,7 @@ class TestTransition:
         assert t2.nails[1].pos == (2, 2)
 
         t3 = Transition(
-            source="id1", target="id2", guard=ConstraintLabel("guard", "x == 0", (1, 3), self.C.ctx())
+            source="id1", target="id2", guard=ConstraintLabel("guard", "x == 0", (1, 3), ctx)
         )
         assert t3.guard is not None
 
@@ -38,7 +34,7 @@ class TestTransition:
         with pytest.raises(KeyError):
             assert Transition(source="id2")
 
-    def test_transition_from_element(self):
+    def test_transition_from_element(self, ctx):
         """Test Transition.from_element()."""
         t1 = Transition.from_element(
             ET.fromstring(
@@ -48,7 +44,7 @@ class TestTransition:
                     <target ref="id17"/>
             </transition>
             """
-            ), self.C.ctx()
+            ), ctx
         )
 
         assert t1.source == "id5"
@@ -72,7 +68,7 @@ sent_info=0</label>
 			<nail x="-464" y="40"/>
 		</transition>
                 """
-            ), self.C.ctx()
+            ), ctx
         )
 
         assert t2.nails[2].pos == (-464, 40)
@@ -81,7 +77,7 @@ sent_info=0</label>
         assert t2.comments is not None
         assert t2.synchronisation is None
 
-    def test_transition_to_element(self):
+    def test_transition_to_element(self, ctx):
         """Test Transition.to_element()."""
         e1 = Transition.from_element(
             ET.fromstring(
@@ -91,7 +87,7 @@ sent_info=0</label>
                     <target ref="id17"/>
             </transition>
             """
-            ), self.C.ctx()
+            ), ctx
         ).to_element()
 
         assert e1.find("source").get("ref") == "id5"
@@ -113,7 +109,7 @@ sent_info=0</label>
 			<nail x="-464" y="40"/>
 		</transition>
                 """
-            ), self.C.ctx()
+            ), ctx
         ).to_element()
 
         labels = e2.findall("label")
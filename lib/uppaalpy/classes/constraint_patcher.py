@@ -2,14 +2,16 @@
 
 from abc import ABCMeta, abstractmethod
 from copy import copy
-from typing import List, Optional, Union, cast
+from functools import lru_cache
+from itertools import groupby
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, cast
 
 from uppaalpy.classes import nodes as n
 from uppaalpy.classes import nta
 from uppaalpy.classes import templates as te
 from uppaalpy.classes import transitions as tr
 from uppaalpy.classes.expr import ClockConstraintExpression
-from uppaalpy.classes.simplethings import ConstraintLabel
+from uppaalpy.classes.simplethings import ConstraintLabel, make_element
 
 
 class ConstraintCache:
@@ -29,9 +31,12 @@ class ConstraintCache:
         <target ref="id0"/>
         <label kind="guard" x="289" y="-25">x &gt;= 100</label>
     </transition>
+
+    For files formatted otherwise, apply_tree applies the patches to an lxml
+    ElementTree of the file instead.
     """
 
-    def __init__(self, nta: nta.NTA) -> None:
+    def __init__(self, nta: "nta.NTA") -> None:
         """Initialize ConstraintCache.
 
         Attributes:
@@ -48,85 +53,280 @@ class ConstraintCache:
 
     def _apply_single_patch(self, lines: List[str], patch: "ConstraintPatch") -> None:
         """Apply a single patch."""
+        self.apply_patches(lines, [patch])
+
+    def _find_object(
+        self, lines: List[str], patch: "ConstraintPatch", cursor: "_Cursor"
+    ) -> Tuple[int, int]:
+        """Find the lines of the object of a patch, from the cursor onwards.
 
-        def handle_loc(i: int, loc: n.Location) -> None:
+        The cursor is moved to the template and the object of the patch.
+
+        Returns:
+            Indices of the first and the last lines of the location or the
+            transition.
+        """
+        template_index = cursor.template_indices[id(patch.template_ref)]
+
+        # Find the line the template starts, unless the cursor is already in it.
+        if cursor.template_index != template_index:
+            i = cursor.template_line
+            curr_template_i = cursor.template_index
+            while curr_template_i < template_index:
+                if lines[i].strip().startswith("<template>"):
+                    curr_template_i += 1
+                i += 1
+            cursor.template_index = template_index
+            cursor.template_line = cursor.object_line = i
+            cursor.transition_index = -1
+            cursor.transition_indices = None
+
+        i = cursor.object_line
+        # Check whether the change is on a location or a transition.
+        if type(patch.obj_ref) == n.Location:
             # Find the line with the relevant location.
-            loc_string = '<location id="%s"' % loc.id
+            loc_string = '<location id="%s"' % cast(n.Location, patch.obj_ref).id
             while loc_string not in lines[i]:
                 i += 1
-            location_line_index = i
+            cursor.transition_index = -1
+            end_tag = "</location>"
+
+        else:
+            # Find the line with the relevant transition. Counting starts from
+            # the transition the cursor is on, if there is one.
+            trans = cast(tr.Transition, patch.obj_ref)
+            if cursor.transition_indices is None:
+                transitions = patch.template_ref.graph._transitions
+                cursor.transition_indices = {
+                    id(t): index for index, t in enumerate(transitions)
+                }
+            trans_index = cursor.transition_indices[id(trans)]
+            curr_trans = max(cursor.transition_index, 0) - 1
+            while curr_trans < trans_index:
+                if lines[i].strip().startswith("<transition>"):
+                    curr_trans += 1
+                i += 1
+            i -= 1
+            cursor.transition_index = trans_index
+            end_tag = "</transition>"
+
+        cursor.object_line = start = i
+        while not lines[i].strip().startswith(end_tag):
+            i += 1
+        return start, i
+
+    @staticmethod
+    def _label_index(block: List[str], obj: Union[n.Location, tr.Transition]) -> int:
+        """Return the index of the line to patch in the lines of an object.
+
+        That is the invariant or the guard line, if the object has one.
+        Otherwise, it is the line the new label should be inserted after.
+
+        Args:
+            block: List of strings for the lines of the object, from its start
+                tag to its end tag.
+            obj: The location or the transition.
+        """
+        if type(obj) == n.Location:
             # If no invariant exists for this location in the file,
             # create a new line for the new invariant label. It should be
             # inserted just after the Name label, if it exists, and before
             # all the other labels.
-            target_index = location_line_index
+            target_index = 0
 
             # Find the invariant line, if it exists.
-            while True:
-                line = lines[i].strip()
+            for i, line in enumerate(block):
+                line = line.strip()
                 if line.startswith('<name x="'):
                     # Invariant comes after name.
                     target_index = i
                 if line.startswith('<label kind="invariant"'):  # Invariant found.
                     target_index = i
                     break
-                if line.startswith("</location>"):  # No invariant
-                    break
-                i += 1
 
-            patch.change.patch_line(lines, target_index, location_line_index)
-
-        def handle_trans(i: int, trans: tr.Transition) -> None:
-            # Find the line with the relevant transition.
-            trans_index = trans.template.graph._transitions.index(trans)
-            curr_trans = -1
-            while curr_trans < trans_index:
-                if lines[i].strip().startswith("<transition>"):
-                    curr_trans += 1
-                i += 1
-            transition_line_index = i - 1
+        else:
             # If no guard exists for this tranisiton in the file,
             # create a new line for the new guard label. It should be
             # inserted just after the Name label, if one exists, and before
             # all the other labels.
-            target_index = transition_line_index + 2  # skip source and target lines
+            target_index = 2  # skip source and target lines
 
             # Find the guard line, if it exists.
-            while True:
-                line = lines[i].strip()
+            for i, line in enumerate(block):
+                line = line.strip()
                 if line.startswith('<label kind="select"'):
                     # Guard comes after select.
                     target_index = i
                 if line.startswith('<label kind="guard"'):  # Guard found.
                     target_index = i
                     break
-                if line.startswith("</transition>"):  # No invariant
-                    break
-                i += 1
 
-            patch.change.patch_line(lines, target_index, transition_line_index)
+        return target_index
 
-        template_index = self.nta.templates.index(patch.template_ref)
-        i = 0
-        curr_template_i = -1
+    def apply_patches(
+        self, lines: List[str], patches: Optional[List["ConstraintPatch"]] = None
+    ) -> None:
+        """Given a list of lines, apply changes the list.
+
+        The patches are applied in a single forward pass over the lines. They
+        are sorted by the position of the changed object in the file, and the
+        search for each object starts where the search for the previous one
+        ended. The patches on an object are applied, in the order they are
+        cached, to a copy of its lines, and its label is looked up once per
+        change in the number of lines. The patched copies and the lines
+        between them are collected in a new list, which replaces the contents
+        of lines at the end, so inserting and removing label lines does not
+        shift the rest of the file.
 
-        # Find the line the template starts.
-        while curr_template_i < template_index:
-            if lines[i].strip().startswith("<template>"):
-                curr_template_i += 1
-            i += 1
+        Args:
+            lines: List of strings for each line.
+            patches: List of patches to apply. Defaults to self.patches.
+        """
+        if patches is None:
+            patches = self.patches
+        if not patches:
+            return
+
+        template_indices = {id(t): i for i, t in enumerate(self.nta.templates)}
+        cursor = _Cursor(template_indices)
+        res = []  # type: List[str]
+        copied = 0  # Index of the first line not copied to res.
+        ordered = sorted(patches, key=self._file_position(template_indices))
+        for _, group in groupby(ordered, key=lambda p: id(p.obj_ref)):
+            obj_patches = list(group)
+            start, end = self._find_object(lines, obj_patches[0], cursor)
+            block = lines[start : end + 1]
+            # Only inserting or removing a label line moves the label, so the
+            # label is searched again only when a patch changes the length.
+            target_index = self._label_index(block, obj_patches[0].obj_ref)
+            for patch in obj_patches:
+                size = len(block)
+                patch.change.patch_line(block, target_index, 0)
+                if len(block) != size:
+                    target_index = self._label_index(block, patch.obj_ref)
+            res.extend(lines[copied:start])
+            res.extend(block)
+            copied = end + 1
+
+        res.extend(lines[copied:])
+        lines[:] = res
+
+    def apply_tree(self, tree, patches: Optional[List["ConstraintPatch"]] = None):
+        """Apply changes to an lxml ElementTree of the associated file.
+
+        The labels of the changed objects are edited in place, and the tree
+        can be written with its write method afterwards. Unlike apply_patches,
+        the file may be formatted in any way. Whitespace between the elements
+        is kept, and new labels are indented like their siblings.
 
-        # Check whether the change is on a location or a transition.
-        if type(patch.obj_ref) == n.Location:
-            handle_loc(i, cast(n.Location, patch.obj_ref))
+        Args:
+            tree: An ElementTree, or its root Element.
+            patches: List of patches to apply. Defaults to self.patches.
 
-        else:
-            handle_trans(i, cast(tr.Transition, patch.obj_ref))
+        Returns:
+            The given tree.
+        """
+        if patches is None:
+            patches = self.patches
+
+        root = tree.getroot() if hasattr(tree, "getroot") else tree
+        # Ids of templates to their elements.
+        template_elements = {
+            id(t): et for t, et in zip(self.nta.templates, root.findall("template"))
+        }
+        # Ids of templates to their location elements by id and transition
+        # elements in order.
+        objects = {}  # type: Dict[int, Tuple[Dict[str, Any], Dict[int, Any]]]
+
+        for patch in patches:
+            template = patch.template_ref
+            template_objects = objects.get(id(template))
+            if template_objects is None:
+                et = template_elements[id(template)]
+                transitions = template.graph._transitions
+                template_objects = (
+                    {loc.get("id"): loc for loc in et.iterchildren("location")},
+                    {
+                        id(t): elem
+                        for t, elem in zip(transitions, et.iterchildren("transition"))
+                    },
+                )
+                objects[id(template)] = template_objects
+
+            if type(patch.obj_ref) == n.Location:
+                loc = cast(n.Location, patch.obj_ref)
+                patch.change.patch_element(template_objects[0][loc.id], "invariant")
+            else:
+                patch.change.patch_element(
+                    template_objects[1][id(patch.obj_ref)], "guard"
+                )
+
+        return tree
+
+    @staticmethod
+    def _file_position(
+        template_indices: Dict[int, int]
+    ) -> Callable[["ConstraintPatch"], Tuple[int, int]]:
+        """Return a sort key for patches, ordering them as their objects in file.
+
+        Objects are ordered by their template, and then by the order they are
+        added to the graph: locations, branchpoints, and transitions. This is
+        the order they are read from the file.
+
+        Args:
+            template_indices: Dictionary mapping the ids of the templates of
+                the NTA to their indices.
+        """
+        positions = {}  # type: Dict[int, Dict[int, int]]
 
-    def apply_patches(self, lines: List[str]):
-        """Given a list of lines, apply changes the list."""
-        for patch in self.patches:
-            self._apply_single_patch(lines, patch)
+        def key(patch: "ConstraintPatch") -> Tuple[int, int]:
+            template = patch.template_ref
+            template_positions = positions.get(id(template))
+            if template_positions is None:
+                graph = template.graph
+                objs = graph.get_nodes()
+                objs.extend(graph._transitions)
+                template_positions = {id(obj): i for i, obj in enumerate(objs)}
+                positions[id(template)] = template_positions
+            return template_indices[id(template)], template_positions[id(patch.obj_ref)]
+
+        return key
+
+
+class _Cursor:
+    """Position of the last applied patch in a pass over the lines.
+
+    Attributes:
+        template_indices: Dictionary mapping the ids of the templates of the
+            NTA to their indices, built once per pass.
+        template_index: Integer index of the template of the last patch.
+        template_line: Integer index of the line after <template>.
+        object_line: Integer index of the first line of the last changed
+            location or transition.
+        transition_index: Integer index of the last changed transition in
+            its template, or -1 if the last changed object is a location.
+        transition_indices: Dictionary mapping the ids of the transitions of
+            the current template to their indices, built for the first
+            changed transition in the template. None until then.
+    """
+
+    __slots__ = (
+        "template_indices",
+        "template_index",
+        "template_line",
+        "object_line",
+        "transition_index",
+        "transition_indices",
+    )
+
+    def __init__(self, template_indices: Dict[int, int]) -> None:
+        """Create a cursor at the start of the file."""
+        self.template_indices = template_indices
+        self.template_index = -1
+        self.template_line = 0
+        self.object_line = 0
+        self.transition_index = -1
+        self.transition_indices = None  # type: Optional[Dict[int, int]]
 
 
 class ConstraintPatch:
@@ -136,6 +336,8 @@ class ConstraintPatch:
     expressions are supported.
     """
 
+    __slots__ = ("template_ref", "change", "obj_ref")
+
     def __init__(
         self,
         template_ref: te.Template,
@@ -157,6 +359,96 @@ class ConstraintPatch:
         self.obj_ref = obj_ref
 
 
+@lru_cache(maxsize=4096)
+def _canonical(string: str) -> str:
+    """Unescape a constraint string read from a file, and strip its spaces.
+
+    The patches on a label canonicalize its constraints again and again, so
+    the results are cached.
+    """
+    return (
+        string.replace(" ", "")
+        .replace("&lt;", "<")
+        .replace("&gt;", ">")
+        .replace("&amp;", "&")
+    )
+
+
+def _find_matching(constraints: List[str], text: str, canonical: str) -> int:
+    """Return the index of the first constraint string matching text.
+
+    Labels written by UPPAAL or by NTA.to_file escape and space constraints
+    as to_string(escape=True) does, so text is looked up first. Otherwise,
+    each constraint string is canonicalized and compared with canonical,
+    the canonical_str of the constraint.
+    """
+    try:
+        return constraints.index(text)
+    except ValueError:
+        pass
+
+    for i, c in enumerate(constraints):
+        if _canonical(c) == canonical:
+            return i
+
+    raise Exception(
+        "{comp} does not match with any of the {lst}".format(
+            comp=canonical, lst=constraints
+        )
+    )
+
+
+def _label_text_span(line: str) -> Tuple[int, int]:
+    """Return the start and the end indices of the text on a label line.
+
+    Label lines are of the form <label kind=".." x=".." y="..">text</label>,
+    and the text is escaped, so the text starts after the first '>' and ends
+    at the next '<'.
+    """
+    start = line.index(">") + 1
+    return start, line.index("<", start)
+
+
+def _find_label(element, kind: str):
+    """Return the child label Element of element with the given kind, or None."""
+    for label in element.iterchildren("label"):
+        if label.get("kind") == kind:
+            return label
+    return None
+
+
+def _insert_child(element, index: int, child) -> None:
+    """Insert child to element at index, indented like the other children.
+
+    The indentation of a child is the whitespace before it, i.e. the text of
+    element for the first child, and the tail of the previous child for the
+    others.
+    """
+    if len(element):
+        indent = element.text
+    else:  # Indent one more tab than the end tag.
+        indent = None if element.text is None else element.text + "\t"
+
+    if index == 0:
+        child.tail = element.text
+        element.text = indent
+    else:
+        prev = element[index - 1]
+        child.tail = prev.tail
+        prev.tail = indent
+    element.insert(index, child)
+
+
+def _remove_child(element, child) -> None:
+    """Remove child from element, keeping the indentation of the rest."""
+    index = element.index(child)
+    if index == 0:
+        element.text = child.tail
+    else:
+        element[index - 1].tail = child.tail
+    element.remove(child)
+
+
 class ConstraintChange(metaclass=ABCMeta):
     """Base class for the three operations on constraint changes.
 
@@ -164,6 +456,8 @@ class ConstraintChange(metaclass=ABCMeta):
         constraint: A ClockConstraintExpression object.
     """
 
+    __slots__ = ("constraint",)
+
     def __init__(self, constraint: ClockConstraintExpression) -> None:
         """Initialize class with the clock constraint expr to be changed."""
         self.constraint = constraint
@@ -173,10 +467,22 @@ class ConstraintChange(metaclass=ABCMeta):
         """Patch a list of lines."""
         pass
 
+    @abstractmethod
+    def patch_element(self, element, kind: str) -> None:
+        """Patch the label of a location or a transition Element.
+
+        Args:
+            element: The location or transition Element.
+            kind: The kind of the label, "invariant" or "guard".
+        """
+        pass
+
 
 class ConstraintRemove(ConstraintChange):
     """Class for keeping track of a constraint removal."""
 
+    __slots__ = ("remove_label",)
+
     def __init__(
         self, constraint: ClockConstraintExpression, remove_label: bool = False
     ) -> None:
@@ -189,7 +495,7 @@ class ConstraintRemove(ConstraintChange):
 
         Args:
             lines: List of strings for each line.
-            index: Integer index of the current line. If self.remove_constraint
+            index: Integer index of the current line. If self.remove_label
                 is False, current line is edited. Otherwise, the line is
                 deleted.
             parent_index: Not used.
@@ -201,8 +507,7 @@ class ConstraintRemove(ConstraintChange):
         else:
             # Edit the current line.
             constraint_line = lines[index]
-            start = constraint_line.index(">") + 1  # '>' in ...y="..">
-            end = constraint_line.index("<", start)  # '<' in </label>
+            start, end = _label_text_span(constraint_line)
             constraints = constraint_line[start:end].split(" &amp;&amp; ")
             constraints.pop(self._find_matching_constraint(constraints))
             lines[index] = (
@@ -211,27 +516,36 @@ class ConstraintRemove(ConstraintChange):
                 + constraint_line[end:]
             )
 
-    def _find_matching_constraint(self, constraints: List[str]) -> int:
-        """Find the index of the constraint to be deleted.
+    def patch_element(self, element, kind: str) -> None:
+        """Remove a constraint by editing or removing a label Element."""
+        label = _find_label(element, kind)
+        if self.remove_label:
+            _remove_child(element, label)
 
-        Each string is compared with the constraint to be removed.
-        """
-        comparison_string = self.constraint.to_string(escape=True).replace(" ", "")
+        else:
+            constraints = label.text.split(" && ")
+            constraints.pop(self._find_matching_constraint(constraints, False))
+            label.text = " && ".join(constraints)
 
-        for i, c in enumerate(constraints):
-            if c.replace(" ", "") == comparison_string:
-                return i
+    def _find_matching_constraint(
+        self, constraints: List[str], escape: bool = True
+    ) -> int:
+        """Find the index of the constraint to be deleted.
 
-        raise Exception(
-            "{comp} does not match with any of the {lst}".format(
-                comp=comparison_string, lst=constraints
-            )
+        Each string is compared with the constraint to be removed. If escape
+        is False, the strings are taken to be unescaped.
+        """
+        constraint = self.constraint
+        return _find_matching(
+            constraints, constraint.to_string(escape), constraint.canonical_str()
         )
 
 
 class ConstraintInsert(ConstraintChange):
     """Class for keeping track of a constraint insertion."""
 
+    __slots__ = ("newly_created",)
+
     def __init__(
         self,
         constraint: ClockConstraintExpression,
@@ -250,23 +564,23 @@ class ConstraintInsert(ConstraintChange):
 
         Args:
             lines: List of strings for each line.
-            index: Integer index of the current line. If self.created_new is
+            index: Integer index of the current line. If self.newly_created is
                 not none, a new line after the current line is inserted for the
                 new invariant/guard label. Otherwise, the new constraint is inserted
                 to the current line.
             parent_index: Integer index of the parent transition/location.
                 Used for indentation while inserting a new line.
         """
-        if self.newly_created is not None:
+        text = self.constraint.to_string(escape=True)
+        label = self.newly_created
+        if label is not None:
             # Insert new line after the current line.
             tabs = lines[parent_index].index("<") + 1
+            x, y = label.pos
             string = (
                 tabs * "\t"
                 + '<label kind="{kind}" x="{x}" y="{y}">{text}</label>\n'.format(
-                    kind=self.newly_created.kind,
-                    x=str(self.newly_created.pos[0]),
-                    y=str(self.newly_created.pos[1]),
-                    text=self.constraint.to_string(escape=True),
+                    kind=label.kind, x=x, y=y, text=text
                 )
             )
             lines.insert(index + 1, string)
@@ -274,19 +588,46 @@ class ConstraintInsert(ConstraintChange):
         else:
             # Edit the current line.
             constraint_line = lines[index]
-            start = constraint_line.index(">") + 1  # '>' in ...y="..">
-            insertion_point = constraint_line.index("<", start)  # '<' in </label>
-            edited_line = "{prev} &amp;&amp; {text}{rest}".format(
+            _, insertion_point = _label_text_span(constraint_line)
+            lines[index] = "{prev} &amp;&amp; {text}{rest}".format(
                 prev=constraint_line[:insertion_point],
-                text=self.constraint.to_string(escape=True),
+                text=text,
                 rest=constraint_line[insertion_point:],
             )
-            lines[index] = edited_line
+
+    def patch_element(self, element, kind: str) -> None:
+        """Insert a constraint by editing or inserting a label Element.
+
+        A new invariant is inserted after the name of the location, and a new
+        guard after the select label or the target of the transition.
+        """
+        text = self.constraint.to_string()
+        if self.newly_created is not None:
+            if kind == "invariant":
+                prev = element.find("name")
+            else:
+                prev = _find_label(element, "select")
+                if prev is None:
+                    prev = element.find("target")
+            index = 0 if prev is None else element.index(prev) + 1
+
+            pos = self.newly_created.pos
+            label = make_element(
+                "label", None, {"kind": kind, "x": str(pos[0]), "y": str(pos[1])}
+            )
+            label.text = text
+            _insert_child(element, index, label)
+
+        else:
+            label = _find_label(element, kind)
+            label.text += " && " + text
 
 
 class ConstraintUpdate(ConstraintChange):
     """Class for keeping track of a constraint update."""
 
+    __slots__ = ("old", "new")
+
     def __init__(
         self, constraint: ClockConstraintExpression, new_threshold: str
     ) -> None:
@@ -305,39 +646,46 @@ class ConstraintUpdate(ConstraintChange):
         """
         parent_index
         constraint_line = lines[index]
-        start = constraint_line.index(">") + 1  # '>' in ...y="..">
-        end = constraint_line.index("<", start)  # '<' in </label>
+        start, end = _label_text_span(constraint_line)
         constraints = constraint_line[start:end].split(" &amp;&amp; ")
         update_index = self._find_matching_constraint(constraints)
-        constraints[update_index] = constraints[update_index].replace(
-            self.old, self.new
-        )
+        constraints[update_index] = self._replace_threshold(constraints[update_index])
         lines[index] = (
             constraint_line[:start]
             + " &amp;&amp; ".join(constraints)
             + constraint_line[end:]
         )
 
-    def _find_matching_constraint(self, constraints: List[str]) -> int:
+    def patch_element(self, element, kind: str) -> None:
+        """Update a constraint by editing a label Element."""
+        label = _find_label(element, kind)
+        constraints = label.text.split(" && ")
+        update_index = self._find_matching_constraint(constraints, False)
+        constraints[update_index] = self._replace_threshold(constraints[update_index])
+        label.text = " && ".join(constraints)
+
+    def _replace_threshold(self, constraint: str) -> str:
+        """Replace only the threshold, e.g. the last "5" in "x5 < 5"."""
+        if self.constraint._threshold_side == "left":
+            return constraint.replace(self.old, self.new, 1)
+        head, _, tail = constraint.rpartition(self.old)
+        return head + self.new + tail
+
+    def _find_matching_constraint(
+        self, constraints: List[str], escape: bool = True
+    ) -> int:
         """Find the index of the constraint to be updated.
 
-        Each string is compared with the constraint to be updated.
+        Each string is compared with the constraint to be updated. If escape
+        is False, the strings are taken to be unescaped.
         """
-        # Get the old comparison string.
-        comparison_string = (
-            self.constraint.to_string(escape=True)
-            .replace(" ", "")
-            .replace(self.constraint.threshold, self.old)
-        )
-
-        for i, c in enumerate(constraints):
-            if c.replace(" ", "") == comparison_string:
-                return i
-
-        raise Exception(
-            "{comp} does not match with any of the {lst}".format(
-                comp=comparison_string, lst=constraints
-            )
+        # Get the old comparison strings.
+        constraint, old = self.constraint, self.old
+        threshold = constraint.threshold
+        return _find_matching(
+            constraints,
+            constraint.to_string(escape).replace(threshold, old),
+            constraint.canonical_str().replace(threshold, old),
         )
 
     def generate_new_constraint(self) -> ClockConstraintExpression:
@@ -1,6 +1,7 @@
 """Class definitions for definitions and declarations in the global scope of the TA."""
 
 from copy import deepcopy
+from sys import intern
 from typing import Dict, List, Optional, Set, Tuple, Type
 
 # from uppaalpy.classes import simplethings as s
@@ -16,6 +17,9 @@ class Context:
         clocks: A list of clock names.
         constants: A dict from identifier strings to values.
         initial_state: A dict from identifier strings to values.
+        _parsed_constraints: A dict from guard and invariant strings to their
+            parsed constraints. Filled by ConstraintLabel, see
+            simplethings._parse_constraints.
 
     Methods:
         empty: Create an empty context.
@@ -39,6 +43,7 @@ class Context:
         self.clocks = clocks
         self.constants = constants
         self.initial_state = initial_state
+        self._parsed_constraints = {}  # type: Dict[str, tuple]
 
     @classmethod
     def empty(cls: Type["Context"]) -> "Context":
@@ -59,24 +64,29 @@ class Context:
 
     def is_constant(self, identifier: str) -> bool:
         """Return True if the identifier is a constant."""
-        return self._is_in(identifier, "constants")
+        return identifier in self.constants
 
     def is_variable(self, identifier: str) -> bool:
         """Return True if the identifier is a variable."""
-        return self._is_in(identifier, "initial_state")
+        return identifier in self.initial_state
 
     @staticmethod
     def is_literal(string: str) -> bool:
-        """Return True if the given string is a number."""
+        """Return True if the given string is a number.
+
+        Plain numbers and identifiers are told apart with string methods.
+        int() is tried only for the rest, such as signed numbers.
+        """
+        if string.isdecimal():
+            return True
+        if string.isidentifier():
+            return False
         try:
             int(string)
             return True
         except ValueError:
             return False
 
-    def _is_in(self, identifier: str, attrib: str) -> bool:
-        return identifier in getattr(self, attrib).keys()
-
     def get_val(self, identifier: str) -> int:
         """Return the value of a literal, a constant or a variable.
 
@@ -124,7 +134,7 @@ class Context:
         # clock clock1, c2, x; // Some comments...
         #       ^....^  ^^  ^
         for c in line[6 : line.index(";")].split(","):
-            self.clocks.add(c.strip())
+            self.clocks.add(intern(c.strip()))
 
     def _parse_constants(self, line: str) -> None:
         """Given a line starting with "cont int" parse constants."""
@@ -1,6 +1,9 @@
 """Classes for representing various expressions."""
 
 from abc import ABCMeta, abstractmethod
+import re
+from functools import lru_cache
+from sys import intern
 from typing import List, Literal, Sequence, Tuple, TypeVar, Union
 
 from uppaalpy.classes import context as c # import Context, MutableContext
@@ -36,6 +39,8 @@ class Expression(metaclass=ABCMeta):
             complex expression string.
     """
 
+    __slots__ = ("lhs", "op", "rhs")
+
     delimiter: str = ""
 
     def __init__(self, exprstr: str, ctx: c.Context, ops: Sequence[str] = "=<>!+-") -> None:
@@ -46,6 +51,13 @@ class Expression(metaclass=ABCMeta):
     def tokenize(string: str, ops: Sequence[str] = "=<>!+-") -> Tuple[str, str, str]:
         """Tokenize the input string.
 
+        The operator is the first one or two consecutive operator characters
+        in the string. It is found with a compiled regular expression, so the
+        string is scanned in C instead of character by character. Operators
+        are interned, as are clock names in the subclasses, so that the many
+        copies of them in an NTA share one string. Results are cached, since
+        the same expression strings recur throughout an NTA.
+
         Returns a tuple of strings of the form (lhs, op, rhs).
 
         Args:
@@ -55,20 +67,18 @@ class Expression(metaclass=ABCMeta):
         Returns:
             A 3-tuple of strings.
         """
-        lhs, op, rhs = "", "", ""
-
-        # foo <= bar
-        for i, c in enumerate(string):
-            if c in ops:
-                op = c
-                nextc = string[i + 1]
-                lhs = string[:i].strip()
-                rhs = string[i + 1 :].strip()
-                if nextc in ops:  # if
-                    op += nextc
-                    rhs = rhs[1:].strip()
-                break
-        return lhs, op, rhs
+        return _tokenize(string, "".join(ops))
+
+    def __copy__(self: E) -> E:
+        """Return a shallow copy of the expression.
+
+        The slots are copied directly, which is much faster than the default
+        copy protocol. Subclasses with more slots extend this method.
+        """
+        cls = type(self)
+        res = cls.__new__(cls)
+        res.lhs, res.op, res.rhs = self.lhs, self.op, self.rhs
+        return res
 
     @classmethod
     @abstractmethod
@@ -78,7 +88,7 @@ class Expression(metaclass=ABCMeta):
 
     def to_string(self) -> str:
         """Convert the expression back to a string."""
-        return " ".join([self.lhs, self.op, self.rhs])
+        return " ".join((self.lhs, self.op, self.rhs))
 
     @classmethod
     def split_into_simple(cls, complex_str: str) -> List[str]:
@@ -88,7 +98,7 @@ class Expression(metaclass=ABCMeta):
     @classmethod
     def join_expressions(cls, exprs: List[E]) -> str:
         """Join a sequence of simple expressions into one expression string."""
-        return cls.join_strings([expr.to_string() for expr in exprs])
+        return cls.delimiter.join([expr.to_string() for expr in exprs])
 
     @classmethod
     def join_strings(cls, exprstrs: List[str]) -> str:
@@ -109,6 +119,8 @@ class UpdateExpression(Expression):
     Is extended by ClockResetExpression.
     """
 
+    __slots__ = ()
+
     delimiter = ", "
 
     @classmethod
@@ -136,10 +148,18 @@ class ClockResetExpression(UpdateExpression):
     Extends UpdateExpression with the additional "clock" attribute.
     """
 
+    __slots__ = ("clock",)
+
     def __init__(self, exprstr: str, _ctx: c.Context) -> None:
         """Create a ClockResetExpression."""
         super().__init__(exprstr, _ctx)
-        self.clock: str = self.lhs
+        self.clock: str = intern(self.lhs)
+
+    def __copy__(self) -> "ClockResetExpression":
+        """Return a shallow copy of the expression."""
+        res = super().__copy__()
+        res.clock = self.clock
+        return res
 
 
 class ConstraintExpression(Expression):
@@ -163,6 +183,8 @@ class ConstraintExpression(Expression):
     constructs the ClockConstraint's initializer.
     """
 
+    __slots__ = ()
+
     delimiter = " && "
 
     @classmethod
@@ -200,6 +222,8 @@ class ClockConstraintExpression(ConstraintExpression):
         _threshold_side: Either "left" or "right", used by the threshold property.
     """
 
+    __slots__ = ("_threshold_side", "clocks", "operator", "equality")
+
     def __init__(self, string: str, ctx: c.Context) -> None:
         """Construct a clock constraint."""
         super().__init__(string, ctx, "<>=")
@@ -207,20 +231,33 @@ class ClockConstraintExpression(ConstraintExpression):
         self.clocks: List[str]
 
         # Determine which side the threshold is.
-        if (
+        if ctx.is_clock(self.lhs):  # Fast path for the common "x < 10" shape.
+            self._threshold_side = "right"
+            self.lhs = intern(self.lhs)
+            self.clocks = [self.lhs]
+        elif (
             ctx.is_constant(self.lhs)
             or ctx.is_literal(self.lhs)
             or ctx.is_variable(self.lhs)
         ):
             self._threshold_side = "left"
-            self.clocks = [c.strip() for c in self.rhs.split("-")]
+            self.clocks = [intern(c.strip()) for c in self.rhs.split("-")]
         else:
             self._threshold_side = "right"
-            self.clocks = [c.strip() for c in self.lhs.split("-")]
+            self.clocks = [intern(c.strip()) for c in self.lhs.split("-")]
 
         self.operator = self.op[0]
         self.equality = len(self.op) == 2
 
+    def __copy__(self) -> "ClockConstraintExpression":
+        """Return a copy of the expression with its own list of clocks."""
+        res = super().__copy__()
+        res._threshold_side = self._threshold_side
+        res.clocks = self.clocks[:]
+        res.operator = self.operator
+        res.equality = self.equality
+        return res
+
     @property
     def threshold(self):
         if self._threshold_side == "left":
@@ -245,15 +282,49 @@ class ClockConstraintExpression(ConstraintExpression):
         If escape is True '<', '>', etc. will be escaped to make the
         resulting string xml-friendly.
         """
-        if self.equality:
-            self.operator += "="
-        res = super().to_string()
+        res = " ".join((self.lhs, self.op, self.rhs))
         if escape:
-            res = (
-                res.replace("&", "&amp;")
-                .replace('"', "&apos;")
-                .replace("<", "&lt;")
-                .replace(">", "&gt;")
-                .replace("'", "&quot;")
-            )
+            res = _escape(res)
         return res
+
+    def canonical_str(self) -> str:
+        """Return the unescaped string of the constraint without spaces.
+
+        Used by the constraint patcher to find the constraint in a label,
+        regardless of how the label is spaced.
+        """
+        return "".join((self.lhs, self.op, self.rhs)).replace(" ", "")
+
+
+@lru_cache(maxsize=None)
+def _operator_pattern(ops: str) -> "re.Pattern[str]":
+    """Compile a pattern matching one or two characters from ops."""
+    char = "[%s]" % re.escape(ops)
+    return re.compile(char + char + "?")
+
+
+@lru_cache(maxsize=4096)
+def _tokenize(string: str, ops: str) -> Tuple[str, str, str]:
+    """Tokenize string with the operator characters in ops, see tokenize."""
+    match = _operator_pattern(ops).search(string)
+    if match is None:
+        return "", "", ""
+    start, end = match.span()
+    op = intern(string[start:end])
+    return string[:start].strip(), op, string[end:].strip()
+
+
+@lru_cache(maxsize=4096)
+def _escape(string: str) -> str:
+    """Escape a constraint string for xml.
+
+    The constraint patcher escapes the same few constraint strings over and
+    over, so the results are cached.
+    """
+    return (
+        string.replace("&", "&amp;")
+        .replace('"', "&apos;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace("'", "&quot;")
+    )
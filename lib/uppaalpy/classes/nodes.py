@@ -1,13 +1,13 @@
 """Module for definitions of abstract class Node, and subclasses BranchPoint and Location."""
 
-from typing import Any, Dict, List, Optional, Tuple, Type
+from typing import Any, Dict, List, Optional, Type
 
 import lxml.etree as ET
 
 from uppaalpy.classes import templates as t
 from uppaalpy.classes.context import Context
 from uppaalpy.classes.expr import ConstraintExpression
-from uppaalpy.classes.simplethings import ConstraintLabel, Label, Name
+from uppaalpy.classes.simplethings import ConstraintLabel, Label, Name, make_element
 
 
 class Node:
@@ -18,11 +18,13 @@ class Node:
     Attributes:
         id: String of the form "idX".
         pos: Pair of ints for storing the position of the node.
+
+    Nodes and their subclasses use __slots__ for cheaper attribute access.
     """
 
+    __slots__ = ("id", "pos")
+
     tag = None  # type: Optional[str]
-    id = "null"  # type: str
-    pos = (0, 0)  # type: Tuple[int, int]
 
     @staticmethod
     def generate_dict(et, ctx: Context) -> Dict[str, Any]:
@@ -51,11 +53,15 @@ class Node:
 
         return kw
 
-    def to_element(self):
-        """Convert this object to an Element. Is extended by Location.to_element."""
-        element = ET.Element(
+    def to_element(self, parent=None):
+        """Convert this object to an Element. Is extended by Location.to_element.
+
+        If parent is given, the element is created as its SubElement.
+        """
+        element = make_element(
             self.tag,
-            attrib={"id": self.id, "x": str(self.pos[0]), "y": str(self.pos[1])},
+            parent,
+            {"id": self.id, "x": str(self.pos[0]), "y": str(self.pos[1])},
         )
         return element
 
@@ -66,6 +72,8 @@ class BranchPoint(Node):
     The only extension is the added class attribute tag.
     """
 
+    __slots__ = ()
+
     tag = "branchpoint"
 
     def __init__(self, **kwargs):
@@ -100,6 +108,18 @@ class Location(Node):
         template: The parent template, set by TAGraph.
     """
 
+    __slots__ = (
+        "name",
+        "invariant",
+        "exponentialrate",
+        "testcodeEnter",
+        "testcodeExit",
+        "comments",
+        "committed",
+        "urgent",
+        "template",
+    )
+
     tag = "location"
 
     def __init__(self, **kwargs) -> None:
@@ -124,28 +144,29 @@ class Location(Node):
         """Generate a dictionary for initialization from et and construct a Loc."""
         return cls(**super().generate_dict(et, ctx))
 
-    def to_element(self):
+    def to_element(self, parent=None):
         """Convert this object to an Element.
 
-        This method extends Node.to_element.
+        This method extends Node.to_element. Child elements are created in
+        place with SubElement.
         """
-        element = super().to_element()
+        element = super().to_element(parent)
         if self.name is not None:
-            element.append(self.name.to_element())
+            self.name.to_element(element)
         if self.invariant is not None:
-            element.append(self.invariant.to_element())
+            self.invariant.to_element(element)
         if self.exponentialrate is not None:
-            element.append(self.exponentialrate.to_element())
+            self.exponentialrate.to_element(element)
         if self.testcodeEnter is not None:
-            element.append(self.testcodeEnter.to_element())
+            self.testcodeEnter.to_element(element)
         if self.testcodeExit is not None:
-            element.append(self.testcodeExit.to_element())
+            self.testcodeExit.to_element(element)
         if self.comments is not None:
-            element.append(self.comments.to_element())
+            self.comments.to_element(element)
         if self.committed:
-            element.append(ET.Element("committed"))
+            ET.SubElement(element, "committed")
         if self.urgent:
-            element.append(ET.Element("urgent"))
+            ET.SubElement(element, "urgent")
         return element
 
     def get_constraints(self) -> List[ConstraintExpression]:
@@ -1,5 +1,6 @@
 """Class definition of UPPAAL NTA."""
-from typing import Callable, List, Optional, Type, Union, cast
+from io import BytesIO
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Type, Union, cast
 
 import lxml.etree as ET
 
@@ -25,9 +26,15 @@ class NTA:
             here for fast write operations.
         _associated_file: String for denoting the path of the file read. Used
             by constraint patcher. Set by the from_xml method.
+        _flushed_lines: List of lines of the associated file with the first
+            _flushed_count patches of the patch cache applied. None until the
+            file is read by the first call to flush_constraint_changes.
+        _flushed_count: Integer for the number of patches in _flushed_lines.
         _doctype: String for xml doctype. Set by from_xml, and used by to_file.
     """
 
+    _top_level_tags = ("declaration", "template", "system", "queries")
+
     def __init__(self, **kwargs) -> None:
         """Initialize NTA from keyword arguments.
 
@@ -41,71 +48,169 @@ class NTA:
         self.queries = kwargs["queries"]  # type: List[Query]
         self.patch_cache = cp.ConstraintCache(self)
         self._associated_file: str = ""
+        self._flushed_lines: Optional[List[str]] = None
+        self._flushed_count = 0
         self._doctype: str = ""
 
     @classmethod
     def from_xml(cls: Type["NTA"], path: str) -> "NTA":
-        """Given a xml file path, construct an NTA from that xml file."""
-        et = ET.parse(path)
-        obj = cls.from_element(et.getroot())
+        """Given a xml file path, construct an NTA from that xml file.
+
+        The file is read with iterparse. Top level elements, and the graph
+        elements of templates, are converted as soon as they are parsed, and
+        their subtrees are freed afterwards so that big files are not kept in
+        memory as a whole. ID collection is turned off as no lookups by ID are
+        done, and the libxml2 size limits are lifted for big declarations.
+        Whitespace between elements is dropped by the parser, since the output
+        is indented anew, and entities are not resolved.
+        """
+        kw = cls._initial_kwargs()
+        events = ET.iterparse(
+            path,
+            events=("end",),
+            tag=cls._top_level_tags + te.Template._graph_tags,
+            huge_tree=True,
+            collect_ids=False,
+            remove_blank_text=True,
+            resolve_entities=False,
+        )
+        template = None  # type: Optional[te.Template]
+        for _, elem in events:
+            parent = elem.getparent()
+            if parent.getparent() is not None:  # A child of a template.
+                if elem.tag == "declaration":
+                    continue  # Read by Template.from_header.
+                if template is None:
+                    template = te.Template.from_header(parent, kw["context"])
+                template.read_graph_element(elem)
+            elif elem.tag == "template":
+                if template is None:  # A template with no graph elements.
+                    template = te.Template.from_header(elem, kw["context"])
+                kw["templates"].append(template)
+                template = None
+            else:
+                cls._read_top_level(kw, elem)
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+        obj = cls(**kw)
         obj._associated_file = path
-        obj._doctype = et.docinfo.doctype
+        obj._doctype = events.root.getroottree().docinfo.doctype
         return obj
 
     @classmethod
     def from_element(cls: Type["NTA"], et) -> "NTA":
         """Construct NTA from Element, and return it."""
-        kw = {}
-        kw["declaration"] = Declaration.from_element(et.find("declaration"))
+        kw = cls._initial_kwargs()
+        for child in et.iterchildren(*cls._top_level_tags):
+            cls._read_top_level(kw, child)
+        return cls(**kw)
 
-        if kw["declaration"] is None or kw["declaration"].text is None:
-            kw["context"] = Context.parse_context(None)
-        else:
+    @staticmethod
+    def _initial_kwargs() -> Dict[str, Any]:
+        """Return the keyword arguments for an NTA with no elements read yet."""
+        return {
+            "declaration": None,
+            "context": Context.parse_context(None),
+            "templates": [],
+            "system": None,
+            "queries": [],
+        }
+
+    @staticmethod
+    def _read_top_level(kw: Dict[str, Any], et) -> None:
+        """Convert a child Element of the nta element and store it in kw."""
+        if et.tag == "declaration":
+            kw["declaration"] = Declaration.from_element(et)
             kw["context"] = Context.parse_context(kw["declaration"].text)
-        kw["templates"] = [
-            te.Template.from_element(template, kw["context"])
-            for template in et.iterchildren("template")
-        ]
-        kw["system"] = SystemDeclaration.from_element(et.find("system"))
-        if et.find("queries") is None:
-            kw["queries"] = []
-        else:
-            kw["queries"] = [
-                Query.from_element(query) for query in et.find("queries").iter("query")
-            ]
-        return cls(**kw)
+        elif et.tag == "template":
+            kw["templates"].append(te.Template.from_element(et, kw["context"]))
+        elif et.tag == "system":
+            kw["system"] = SystemDeclaration.from_element(et)
+        else:  # et.tag == "queries"
+            kw["queries"] = [Query.from_element(query) for query in et.iter("query")]
 
     def to_element(self):
         """Construct an Element object, and return it."""
         root = ET.Element("nta")
 
         if self.declaration is not None:
-            et_declaration = ET.SubElement(root, "declaration")
-            et_declaration.text = self.declaration.text
+            self.declaration.to_element(root)
 
         for template in self.templates:
-            root.append(template.to_element())
+            template.to_element(root)
 
-        root.append(self.system.to_element())
+        self.system.to_element(root)
         queries = ET.SubElement(root, "queries")
         for query in self.queries:
-            queries.append(query.to_element())
+            query.to_element(queries)
 
         return root
 
-    def to_file(self, path: str) -> None:
-        r"""Convert the NTA to an element tree and write it into a file.
+    def _top_level_elements(self, pretty: bool):
+        """Generate the children of the nta element one by one for to_file.
 
-        File will be printed with pretty printing and '\t' indentation.
+        Each element is converted on the fly, so that only one of them is in
+        memory at a time. If pretty is True, the template and queries elements
+        are indented, since the others have no children.
+        """
+        if self.declaration is not None:
+            yield self.declaration.to_element()
+
+        for template in self.templates:
+            element = template.to_element()
+            if pretty:
+                ET.indent(element, "\t", level=1)
+            yield element
+
+        yield self.system.to_element()
+        queries = ET.Element("queries")
+        for query in self.queries:
+            query.to_element(queries)
+        if pretty:
+            ET.indent(queries, "\t", level=1)
+        yield queries
+
+    def to_file(self, path: Union[str, BinaryIO], pretty: bool = True) -> None:
+        r"""Serialize the NTA incrementally and write it into a file.
+
+        The children of the nta element are converted and written one at a
+        time with lxml's xmlfile, so the element tree of the whole NTA is
+        never built.
+
+        By default, the file is printed with pretty printing and '\t'
+        indentation, which is the layout UPPAAL uses and flush_constraint_changes
+        expects. If pretty is False, the indentation pass is skipped and the
+        elements are written as is.
 
         Args:
-            path: String denoting the path of the output file.
+            path: String denoting the path of the output file, or a binary
+                file object open for writing. File objects are not closed, so
+                they can be reused for many writes.
+            pretty: Boolean for indenting the output. Defaults to True.
         """
-        elm = self.to_element()
-        ET.indent(elm, "\t")
-        ET.ElementTree(elm).write(
-            path, encoding="utf-8", xml_declaration=True, doctype=self._doctype
-        )
+        self._write(path, pretty)
+
+    def to_bytes(self, pretty: bool = True) -> bytes:
+        """Serialize the NTA like to_file, but return the bytes instead."""
+        output = BytesIO()
+        self._write(output, pretty)
+        return output.getvalue()
+
+    def _write(self, output: Union[str, BinaryIO], pretty: bool) -> None:
+        """Write the NTA to a file path or a binary file object."""
+        with ET.xmlfile(output, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            if self._doctype:
+                xf.write_doctype(self._doctype)
+            with xf.element("nta"):
+                for elm in self._top_level_elements(pretty):
+                    if pretty:
+                        xf.write("\n\t")
+                    xf.write(elm)
+                if pretty:
+                    xf.write("\n")
 
     def change_clock_constraint(
         self,
@@ -173,23 +278,41 @@ class NTA:
             new = threshold_function(ccexp.threshold)
             change = cp.ConstraintUpdate(ccexp, new)
             index = label.constraints.index(ccexp)
-            label.constraints.pop(index)
-            label.constraints.insert(index, change.generate_new_constraint())
+            label.constraints[index] = change.generate_new_constraint()
 
         patch = cp.ConstraintPatch(cast(te.Template, obj.template), change, obj)
         self.patch_cache.cache(patch)
 
-    def flush_constraint_changes(self, out_path):
+    def flush_constraint_changes(self, out_path: Union[str, BinaryIO]) -> None:
         """Read the associated_file and write the modified version to new file.
 
-        The xml file the NTA is constructed from is read again and the lines
-        are updated according to the patch_cache's update records.
+        The lines of the xml file the NTA is constructed from are read on the
+        first call and kept on the NTA. Each call applies only the patches
+        cached since the previous call to those lines. out_path can also be a binary file object, which is not closed.
         See: constraint_patcher.py
         """
-        with open(self._associated_file) as input_file:
-            lines = input_file.readlines()
+        lines = self._patched_lines()
 
-        self.patch_cache.apply_patches(lines)
+        if isinstance(out_path, str):
+            with open(out_path, "w") as output_file:
+                output_file.writelines(lines)
+        else:  # A binary file object.
+            out_path.write("".join(lines).encode("utf-8"))
 
-        with open(out_path, "w") as output_file:
-            output_file.writelines(lines)
+    def _patched_lines(self) -> List[str]:
+        """Return the lines of the associated file with the patches applied.
+
+        The returned list is kept on the NTA for the next call, and must not
+        be modified.
+        """
+        lines = self._flushed_lines
+        if lines is None:
+            with open(self._associated_file) as input_file:
+                lines = self._flushed_lines = input_file.readlines()
+
+        patches = self.patch_cache.patches
+        if self._flushed_count < len(patches):
+            new = patches[self._flushed_count :]
+            self.patch_cache.apply_patches(lines, new)
+            self._flushed_count = len(patches)
+        return lines
@@ -1,6 +1,7 @@
 """Basic classes used by other classes throughout the project."""
 
-from typing import List, Optional, Tuple, Type, TypeVar
+from copy import copy
+from typing import Dict, List, Optional, Tuple, Type, TypeVar
 
 import lxml.etree as ET
 
@@ -14,6 +15,17 @@ Updates = List[e.UpdateExpression]
 L = TypeVar("L", bound="Label")
 
 
+def make_element(tag: str, parent=None, attrib: Optional[Dict[str, str]] = None):
+    """Create an Element, or a SubElement of parent if parent is given.
+
+    Creating children directly inside their parent's document avoids the
+    subtree moves lxml performs when an Element is appended to another tree.
+    """
+    if parent is None:
+        return ET.Element(tag, attrib)
+    return ET.SubElement(parent, tag, attrib)
+
+
 class Label:
     """A label object from UPPAAL.
 
@@ -30,6 +42,8 @@ class Label:
         pos: A pair of ints for position. Some label kinds do not have a pos.
     """
 
+    __slots__ = ("kind", "value", "pos")
+
     def __init__(self, kind: str, value: str, pos: Optional[PosType] = None) -> None:
         """Construct a Label object given kind, value, and optional pos.
 
@@ -53,9 +67,12 @@ class Label:
         pos = (int(et.get("x")), int(et.get("y"))) if et.get("x") is not None else None
         return cls(et.get("kind"), et.text, pos)
 
-    def to_element(self):
-        """Convert this object to an Element. Called from NTA.to_element."""
-        element = ET.Element("label", attrib={"kind": self.kind})
+    def to_element(self, parent=None):
+        """Convert this object to an Element. Called from NTA.to_element.
+
+        If parent is given, the element is created as its SubElement.
+        """
+        element = make_element("label", parent, {"kind": self.kind})
         element.text = self.value
         if self.pos is not None:
             element.set("x", str(self.pos[0]))
@@ -75,6 +92,8 @@ class ConstraintLabel(Label):
         constraints: List of ConstraintExpression
     """
 
+    __slots__ = ("constraints",)
+
     def __init__(
         self,
         kind: str,
@@ -100,10 +119,7 @@ class ConstraintLabel(Label):
         self.constraints: Constraints = (
             constraints
             if constraints
-            else [
-                e.ConstraintExpression.parse_expr(s, ctx)  # Factory
-                for s in e.ConstraintExpression.split_into_simple(value)
-            ]
+            else [copy(expr) for expr in _parse_constraints(value, ctx)]
         )
 
     @classmethod
@@ -131,12 +147,13 @@ class ConstraintLabel(Label):
         pos = (int(et.get("x")), int(et.get("y"))) if et.get("x") is not None else None
         return cls(et.get("kind"), et.text, pos, ctx)
 
-    def to_element(self):
+    def to_element(self, parent=None):
         """Convert this object to an Element.
 
         self.text is ignored, ConstraintExpression.to_string() is used instead.
+        If parent is given, the element is created as its SubElement.
         """
-        element = ET.Element("label", attrib={"kind": self.kind})
+        element = make_element("label", parent, {"kind": self.kind})
         element.text = e.ConstraintExpression.join_expressions(self.constraints)
         if self.pos is not None:
             element.set("x", str(self.pos[0]))
@@ -144,6 +161,29 @@ class ConstraintLabel(Label):
         return element
 
 
+def _parse_constraints(
+    value: str, ctx: c.Context
+) -> Tuple[e.ConstraintExpression, ...]:
+    """Parse the constraints of a guard or an invariant string.
+
+    Generated NTAs repeat the same guards and invariants many times, so the
+    results are memoized in a dict owned by ctx, and are dropped with it.
+    MutableContexts change during computations, so their results are not
+    memoized. ConstraintLabel copies the memoized expressions, as they are
+    changed in place.
+    """
+    memo = ctx._parsed_constraints
+    res = memo.get(value)
+    if res is None:
+        res = tuple(
+            e.ConstraintExpression.parse_expr(s, ctx)  # Factory
+            for s in e.ConstraintExpression.split_into_simple(value)
+        )
+        if not isinstance(ctx, c.MutableContext):
+            memo[value] = res
+    return res
+
+
 class UpdateLabel(Label):
     """A specific label for updates on transitions in timed automata.
 
@@ -155,6 +195,8 @@ class UpdateLabel(Label):
         updates: List of UpdateExpression.
     """
 
+    __slots__ = ("updates",)
+
     def __init__(
         self,
         kind: str,
@@ -208,12 +250,13 @@ class UpdateLabel(Label):
         pos = (int(et.get("x")), int(et.get("y"))) if et.get("x") is not None else None
         return cls(et.get("kind"), et.text, pos, ctx)
 
-    def to_element(self):
+    def to_element(self, parent=None):
         """Convert this object to an Element.
 
         self.text is ignored, UpdateExpression.to_string() is used instead.
+        If parent is given, the element is created as its SubElement.
         """
-        element = ET.Element("label", attrib={"kind": self.kind})
+        element = make_element("label", parent, {"kind": self.kind})
         element.text = e.UpdateExpression.join_expressions(self.updates)
         if self.pos is not None:
             element.set("x", str(self.pos[0]))
@@ -251,6 +294,8 @@ class SimpleField:
     text fields to xml.
     """
 
+    __slots__ = ("text",)
+
     tag = ""
 
     def __init__(self, text: str) -> None:
@@ -267,12 +312,13 @@ class SimpleField:
         else:
             return cls(et.text)
 
-    def to_element(self):
+    def to_element(self, parent=None):
         """Convert this object to an Element. Called from NTA.to_element.
 
-        This method is meant to be used by derived classes.
+        This method is meant to be used by derived classes. If parent is
+        given, the element is created as its SubElement.
         """
-        element = ET.Element(self.tag)
+        element = make_element(self.tag, parent)
         element.text = self.text
         return element
 
@@ -283,6 +329,8 @@ class SystemDeclaration(SimpleField):
     See base class SimpleField.
     """
 
+    __slots__ = ()
+
     tag = "system"
 
 
@@ -297,12 +345,16 @@ class Declaration(SimpleField):
     See base class SimpleField.
     """
 
+    __slots__ = ()
+
     tag = "declaration"
 
 
 class Parameter(SimpleField):
     """A derived class for simple strings in UPPAAL. See class SimpleField."""
 
+    __slots__ = ()
+
     tag = "parameter"
 
 
@@ -314,6 +366,8 @@ class Name:
     UPPAAL xml format regardless.
     """
 
+    __slots__ = ("name", "pos")
+
     def __init__(self, name: str, pos: Optional[Tuple[int, int]]) -> None:
         """Given a string and a pair of ints, construct a Name object."""
         self.name = name
@@ -327,9 +381,12 @@ class Name:
                 return cls(et.text, (int(et.get("x")), int(et.get("y"))))
             return cls(et.text, None)
 
-    def to_element(self):
-        """Convert this object to an Element. Called from NTA.to_element."""
-        element = ET.Element("name")
+    def to_element(self, parent=None):
+        """Convert this object to an Element. Called from NTA.to_element.
+
+        If parent is given, the element is created as its SubElement.
+        """
+        element = make_element("name", parent)
         element.text = self.name
 
         if self.pos is not None:
@@ -347,6 +404,8 @@ class Query:
         comment: String for commenting the query.
     """
 
+    __slots__ = ("formula", "comment")
+
     def __init__(self, formula: str, comment: str) -> None:
         """Query object initializer."""
         self.formula = formula
@@ -357,9 +416,12 @@ class Query:
         """Convert an Element to a Query object."""
         return cls(et.find("formula").text, et.find("comment").text)
 
-    def to_element(self):
-        """Convert this object to an Element."""
-        query = ET.Element("query")
+    def to_element(self, parent=None):
+        """Convert this object to an Element.
+
+        If parent is given, the element is created as its SubElement.
+        """
+        query = make_element("query", parent)
         formula = ET.SubElement(query, "formula")
         formula.text = self.formula
         comment = ET.SubElement(query, "comment")
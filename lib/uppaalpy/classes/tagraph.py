@@ -3,12 +3,12 @@
 from itertools import count
 from typing import Dict, List
 
-import lxml.etree as ET
 import networkx as nx
 
 from uppaalpy.classes import nodes as n
 from uppaalpy.classes import templates as te
 from uppaalpy.classes import transitions as tr
+from uppaalpy.classes.simplethings import make_element
 
 
 class TAGraph(nx.MultiDiGraph):
@@ -73,13 +73,20 @@ class TAGraph(nx.MultiDiGraph):
         )
         self._transitions.append(trans)
 
-    def to_element(self):
-        """Convert the multidigraph to an Element."""
-        elements = [n.to_element() for n in self.get_nodes()]
-        elements.append(ET.Element("init", attrib={"ref": self.initial_location}))
-        elements.extend([t.to_element() for t in self._transitions])
+    def to_element(self, parent=None):
+        """Convert the multidigraph to a list of Elements.
+
+        If parent is given, the elements are created as its SubElements.
+        """
+        elements = [node.to_element(parent) for node in self.get_nodes()]
+        elements.append(make_element("init", parent, {"ref": self.initial_location}))
+        elements.extend([t.to_element(parent) for t in self._transitions])
         return elements
 
     def get_nodes(self):
-        """Get the list of nodes. Also includes branchpoints."""
-        return [data["obj"] for _, data in list(self.nodes(data=True))]
+        """Get the list of nodes. Also includes branchpoints.
+
+        The node attribute dicts are read directly from the underlying
+        networkx storage, without building node views.
+        """
+        return [data["obj"] for data in self._node.values()]
@@ -4,13 +4,11 @@ Each template in an NTA represents a Distinct TA "recipe".
 """
 from typing import Type
 
-import lxml.etree as ET
-
 from uppaalpy.classes import nodes as n
 from uppaalpy.classes import tagraph as g
 from uppaalpy.classes import transitions as tr
 from uppaalpy.classes.context import Context
-from uppaalpy.classes.simplethings import Declaration, Name, Parameter
+from uppaalpy.classes.simplethings import Declaration, Name, Parameter, make_element
 
 
 class Template:
@@ -40,43 +38,60 @@ class Template:
         self.context = ctx
         self.graph = g.TAGraph(self)
 
+    _graph_tags = ("location", "branchpoint", "init", "transition")
+
     @classmethod
     def from_element(cls: Type["Template"], et, ctx: Context) -> "Template":
         """Convert an Element to a Template object. Called from NTA.from_element."""
+        template_obj = cls.from_header(et, ctx)
+        for child in et.iterchildren(*cls._graph_tags):
+            template_obj.read_graph_element(child)
+        return template_obj
+
+    @classmethod
+    def from_header(cls: Type["Template"], et, ctx: Context) -> "Template":
+        """Construct a Template with an empty graph from a template Element.
+
+        Only the name, parameter, and declaration children of et are read.
+        The graph is filled by read_graph_element. Called from NTA.from_xml
+        before the rest of the template element is parsed.
+        """
         template_obj = cls(ctx)
 
         template_obj.name = Name.from_element(et.find("name"))
         template_obj.parameter = Parameter.from_element(et.find("parameter"))
         template_obj.declaration = Declaration.from_element(et.find("declaration"))
 
-        t_name = template_obj.name.name
-
         template_obj.graph = g.TAGraph(template_obj)
-        template_obj.graph.template_name = t_name
-
-        for l in et.iter("location"):
-            loc = n.Location.from_element(l, ctx)
-            template_obj.graph.add_location(loc)
-
-        for b in et.iter("branchpoint"):
-            bp = n.BranchPoint.from_element(b, ctx)
-            template_obj.graph.add_branchpoint(bp)
-
-        template_obj.graph.initial_location = et.find("init").get("ref")
-
-        for t in et.iter("transition"):
-            trans = tr.Transition.from_element(t, ctx)
-            template_obj.graph.add_transition(trans)
+        template_obj.graph.template_name = template_obj.name.name
 
         return template_obj
 
-    def to_element(self):
-        """Convert this object to an Element. Called from NTA.to_element."""
-        element = ET.Element("template")
-        element.append(self.name.to_element())
+    def read_graph_element(self, et) -> None:
+        """Add a location, branchpoint, init, or transition Element to the graph.
+
+        Elements must be given in the document order of UPPAAL files, so that
+        the nodes of a transition are added before the transition.
+        """
+        if et.tag == "location":
+            self.graph.add_location(n.Location.from_element(et, self.context))
+        elif et.tag == "branchpoint":
+            self.graph.add_branchpoint(n.BranchPoint.from_element(et, self.context))
+        elif et.tag == "init":
+            self.graph.initial_location = et.get("ref")
+        else:  # et.tag == "transition"
+            self.graph.add_transition(tr.Transition.from_element(et, self.context))
+
+    def to_element(self, parent=None):
+        """Convert this object to an Element. Called from NTA.to_element.
+
+        If parent is given, the element is created as its SubElement.
+        """
+        element = make_element("template", parent)
+        self.name.to_element(element)
         if self.parameter is not None:
-            element.append(self.parameter.to_element())
+            self.parameter.to_element(element)
         if self.declaration is not None:
-            element.append(self.declaration.to_element())
-        element.extend(self.graph.to_element())
+            self.declaration.to_element(element)
+        self.graph.to_element(element)
         return element
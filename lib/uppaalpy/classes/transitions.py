@@ -7,7 +7,12 @@ import lxml.etree as ET
 from uppaalpy.classes import templates as t
 from uppaalpy.classes.context import Context
 from uppaalpy.classes.expr import ConstraintExpression
-from uppaalpy.classes.simplethings import ConstraintLabel, Label, UpdateLabel
+from uppaalpy.classes.simplethings import (
+    ConstraintLabel,
+    Label,
+    UpdateLabel,
+    make_element,
+)
 
 
 class Transition:
@@ -32,8 +37,23 @@ class Transition:
         comments: Label object with kind 'comments'. See UPPAAL
             documentation.
         nails: List of Nail objectsAny, .
+        template: The parent template. Set by TAGraph.
     """
 
+    __slots__ = (
+        "source",
+        "target",
+        "select",
+        "guard",
+        "synchronisation",
+        "assignment",
+        "testcode",
+        "probability",
+        "comments",
+        "nails",
+        "template",
+    )
+
     def __init__(self, **kwargs) -> None:
         """Construct a Transition object from keyword args.
 
@@ -88,27 +108,31 @@ class Transition:
 
         return cls(**kw)
 
-    def to_element(self):
-        """Convert this object to an Element."""
-        element = ET.Element("transition")
-        element.append(ET.Element("source", attrib={"ref": self.source}))
-        element.append(ET.Element("target", attrib={"ref": self.target}))
+    def to_element(self, parent=None):
+        """Convert this object to an Element.
+
+        If parent is given, the element is created as its SubElement. Child
+        elements are created in place with SubElement.
+        """
+        element = make_element("transition", parent)
+        ET.SubElement(element, "source", {"ref": self.source})
+        ET.SubElement(element, "target", {"ref": self.target})
         if self.select is not None:
-            element.append(self.select.to_element())
+            self.select.to_element(element)
         if self.guard is not None:
-            element.append(self.guard.to_element())
+            self.guard.to_element(element)
         if self.synchronisation is not None:
-            element.append(self.synchronisation.to_element())
+            self.synchronisation.to_element(element)
         if self.assignment is not None:
-            element.append(self.assignment.to_element())
+            self.assignment.to_element(element)
         if self.testcode is not None:
-            element.append(self.testcode.to_element())
+            self.testcode.to_element(element)
         if self.probability is not None:
-            element.append(self.probability.to_element())
+            self.probability.to_element(element)
         if self.comments is not None:
-            element.append(self.comments.to_element())
+            self.comments.to_element(element)
         for nail in self.nails:
-            element.append(nail.to_element())
+            nail.to_element(element)
         return element
 
     def get_constraints(self) -> List[ConstraintExpression]:
@@ -145,6 +169,8 @@ class Nail:
         pos: Pair of ints.
     """
 
+    __slots__ = ("pos",)
+
     def __init__(self, x: int, y: int) -> None:
         """Construct Nail from an int pair.
 
@@ -159,6 +185,11 @@ class Nail:
         """Construct Nail from an Element."""
         return cls(int(et.get("x")), int(et.get("y")))
 
-    def to_element(self):
-        """Construct an element from Nail object."""
-        return ET.Element("nail", attrib={"x": str(self.pos[0]), "y": str(self.pos[1])})
+    def to_element(self, parent=None):
+        """Construct an element from Nail object.
+
+        If parent is given, the element is created as its SubElement.
+        """
+        return make_element(
+            "nail", parent, {"x": str(self.pos[0]), "y": str(self.pos[1])}
+        )
@@ -8,8 +8,6 @@ let
     };
     overrides = pkgs.poetry2nix.overrides.withDefaults (self: super: {
       lazy-object-proxy = pkgs.python38Packages.lazy-object-proxy;
-      decopatch = pkgs.python38Packages.decopatch;
-      pytest-cases = pkgs.python38Packages.pytest-cases;
     });
 
   };